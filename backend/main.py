@@ -2,9 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from src.agents import ColdEmailAgents
-from src.portfolio import Portfolio
+from src.tenants import TenantPortfolios
+from src.dedup import NearDuplicateIndex, DEDUP_SIMILARITY_THRESHOLD
+from src.campaign_store import CampaignStore
 import logging
-from routes import email_generator
+import os
+from routes import email_generator, campaigns
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -29,16 +32,43 @@ app.add_middleware(
 # Initialize components and attach to app state
 try:
     app.state.agents = ColdEmailAgents()
-    app.state.portfolio = Portfolio()
+    app.state.portfolios = TenantPortfolios(
+        os.getenv("TENANT_PORTFOLIO_DIR", "resource/tenants"),
+        max_memory_bytes=int(os.getenv("TENANT_CACHE_MEMORY_MB", "512")) * 1024 * 1024,
+        max_tenants=int(os.getenv("TENANT_CACHE_MAX_TENANTS", "32"))
+    )
+    app.state.portfolios.warm_up(int(os.getenv("TENANT_WARMUP_COUNT", "3")))
     logger.info("Components initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize components: {e}")
     app.state.agents = None
-    app.state.portfolio = None
+    app.state.portfolios = None
+
+try:
+    app.state.dedup_index = NearDuplicateIndex(
+        os.getenv("DEDUP_DB_PATH", "src/dedup.sqlite3"),
+        threshold=DEDUP_SIMILARITY_THRESHOLD
+    )
+except Exception as e:
+    logger.error(f"Failed to open near-duplicate index: {e}")
+    app.state.dedup_index = None
+
+try:
+    app.state.campaign_store = CampaignStore(os.getenv("CAMPAIGN_DB_PATH", "src/campaigns.sqlite3"))
+except Exception as e:
+    logger.error(f"Failed to open campaign store: {e}")
+    app.state.campaign_store = None
+
+@app.on_event("shutdown")
+def save_tenant_usage():
+    if app.state.portfolios is not None:
+        app.state.portfolios.flush_usage()
 
 # Include the new router
 app.include_router(email_generator.router, prefix="/api")
 app.include_router(email_generator.router)
+app.include_router(campaigns.router, prefix="/api")
+app.include_router(campaigns.router)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import logging
+
+from src.campaign_store import CampaignStore
+
+router = APIRouter(prefix="/campaigns")
+logger = logging.getLogger(__name__)
+
+# --- Dependencies ---
+def get_campaign_store(request: Request) -> CampaignStore:
+    if not hasattr(request.app.state, 'campaign_store') or request.app.state.campaign_store is None:
+        raise HTTPException(status_code=500, detail="System components (campaign store) not initialized properly")
+    return request.app.state.campaign_store
+
+# Plain def: FastAPI runs it in its threadpool, keeping the blocking SQLite query off the event loop
+@router.get("/emails")
+def list_emails(
+    tenant: Optional[str] = None,
+    role: Optional[str] = None,
+    source_url: Optional[str] = None,
+    job_hash: Optional[str] = None,
+    since: Optional[float] = Query(None, description="Only emails created at or after this Unix timestamp"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    store: CampaignStore = Depends(get_campaign_store)
+):
+    """Page through previously generated emails, newest first."""
+    emails, next_cursor = store.query(
+        limit=limit, cursor=cursor, since=since,
+        tenant=tenant, role=role, source_url=source_url, job_hash=job_hash
+    )
+    return {"emails": emails, "next_cursor": next_cursor}
+
+@router.get("/export")
+def export_emails(
+    format: str = Query("jsonl", pattern="^(csv|jsonl)$"),
+    tenant: Optional[str] = None,
+    role: Optional[str] = None,
+    source_url: Optional[str] = None,
+    job_hash: Optional[str] = None,
+    since: Optional[float] = None,
+    store: CampaignStore = Depends(get_campaign_store)
+):
+    """Stream every matching email as CSV or JSON Lines without buffering the result set."""
+    filters = {"tenant": tenant, "role": role, "source_url": source_url, "job_hash": job_hash, "since": since}
+    if format == "csv":
+        body, media_type = store.export_csv(**filters), "text/csv"
+    else:
+        body, media_type = store.export_jsonl(**filters), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="campaign_emails.{format}"'}
+    )
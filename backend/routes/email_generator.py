@@ -1,12 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from schema.email import EmailRequest, EmailResponse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
+import os
 
 from src.utils import clean_text
 from langchain_community.document_loaders import WebBaseLoader
-from src.agents import ColdEmailAgents
+from src.agents import ColdEmailAgents, EMAIL_GENERATION_FAILED
 from src.portfolio import Portfolio
+from src.tenants import TenantPortfolios, UnknownTenantError, DEFAULT_TENANT
+from src.deadline import Deadline, DeadlineExceeded
+from src.dedup import NearDuplicateIndex, BatchDeduplicator, DEDUP_SIMILARITY_THRESHOLD, job_text, job_group
+from src.prompts import template_token_report
+from src.campaign_store import CampaignStore
+from src.crawler import CareersCrawler
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -17,16 +27,287 @@ def get_agents(request: Request) -> ColdEmailAgents:
         raise HTTPException(status_code=500, detail="System components (agents) not initialized properly")
     return request.app.state.agents
 
-def get_portfolio(request: Request) -> Portfolio:
-    if not hasattr(request.app.state, 'portfolio') or request.app.state.portfolio is None:
+def get_portfolios(request: Request) -> TenantPortfolios:
+    if not hasattr(request.app.state, 'portfolios') or request.app.state.portfolios is None:
         raise HTTPException(status_code=500, detail="System components (portfolio) not initialized properly")
-    return request.app.state.portfolio
+    return request.app.state.portfolios
+
+def _resolve_portfolio(portfolios: TenantPortfolios, tenant: str) -> Portfolio:
+    try:
+        return portfolios.get(tenant)
+    except UnknownTenantError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def get_dedup_index(request: Request) -> Optional[NearDuplicateIndex]:
+    # Near-duplicate reuse is an optimisation; run without it if the index failed to open
+    return getattr(request.app.state, 'dedup_index', None)
+
+def get_optional_campaign_store(request: Request) -> Optional[CampaignStore]:
+    # Emails are still returned if history can't be recorded
+    return getattr(request.app.state, 'campaign_store', None)
+
+# Upper bound on emails generated concurrently while job extraction is still streaming
+MAX_GENERATION_WORKERS = 4
+
+# Leading characters of the page used to find the tenant's portfolio matches for the crew
+PORTFOLIO_QUERY_CHARS = 1000
+
+# End-to-end time budget per request; clients may ask for less but never more
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "120"))
+
+# How often to poll for a client disconnect while the workflow runs
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Crawl mode limits
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "50"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "3"))
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "2"))
+CRAWL_POLITENESS_DELAY = float(os.getenv("CRAWL_POLITENESS_DELAY", "0.5"))
+
+def _is_generated_email(email_content: Any) -> bool:
+    """True for a real email, False for the placeholders returned when generation fails."""
+    return isinstance(email_content, str) and bool(email_content.strip()) and not email_content.startswith(EMAIL_GENERATION_FAILED)
+
+def _generate_email_for_job(job: Dict[str, Any], agents: ColdEmailAgents, portfolio: Portfolio, deadline: Optional[Deadline] = None, dedup_index: Optional[NearDuplicateIndex] = None, tenant: str = DEFAULT_TENANT) -> Optional[Dict[str, Any]]:
+    """Match a single extracted job against the portfolio and write its cold email."""
+    try:
+        skills = job.get('skills', [])
+        if isinstance(skills, str):
+            skills = [s.strip() for s in skills.split(',') if s.strip()]
+        
+        # Reuse the email written for a near-identical job (same title and experience) in an earlier run
+        kind = f"job:{tenant}:{job_group(job)}"
+        previous = dedup_index.find(job_text(job), kind) if dedup_index else None
+        if previous:
+            similarity, payload = previous
+            logger.info(f"Reusing email for near-duplicate job {job.get('role', 'Unknown')} (similarity {similarity:.2f})")
+            portfolio_matches = payload['portfolio_matches']
+            email_content = payload['email_content']
+        else:
+            portfolio_matches = portfolio.query_links(skills)
+            email_content = agents.generate_cold_email(job, portfolio_matches, deadline)
+            if dedup_index and _is_generated_email(email_content):
+                dedup_index.add(job_text(job), kind, {
+                    "email_content": email_content,
+                    "portfolio_matches": portfolio_matches
+                })
+        
+        return {
+            "job_title": job.get('role', 'Unknown Role'),
+            "job_description": job.get('description', ''),
+            "required_skills": skills,
+            "experience_level": job.get('experience', 'Not specified'),
+            "email_content": email_content,
+            "portfolio_matches": portfolio_matches,
+            "location": job.get('location', 'Not specified'),
+            "work_type": job.get('work_type', 'Not specified')
+        }
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing job {job.get('role', 'Unknown')}: {str(e)}")
+        return None
+
+def _generate_emails_pipelined(jobs: Iterable[Dict[str, Any]], agents: ColdEmailAgents, portfolio: Portfolio, deadline: Optional[Deadline] = None, dedup_index: Optional[NearDuplicateIndex] = None, tenant: str = DEFAULT_TENANT) -> List[Dict[str, Any]]:
+    """Start email generation for each job as it arrives so extraction and generation overlap.
+
+    Near-duplicate jobs on the same page share the email of their first
+    occurrence instead of each getting an LLM call.
+    """
+    executor = ThreadPoolExecutor(max_workers=MAX_GENERATION_WORKERS)
+    deduplicator = BatchDeduplicator(dedup_index.threshold if dedup_index else DEDUP_SIMILARITY_THRESHOLD)
+    futures = []
+    duplicates = {}
+    try:
+        for job in jobs:
+            index, original = deduplicator.match_or_add(job_text(job), job_group(job))
+            if original is None:
+                futures.append(executor.submit(_generate_email_for_job, job, agents, portfolio, deadline, dedup_index, tenant))
+            else:
+                futures.append(futures[original])
+                duplicates[index] = job
+        results = [future.result() for future in futures]
+    finally:
+        # On deadline or error, drop queued jobs rather than generating emails nobody will read
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    emails = []
+    for index, email in enumerate(results):
+        if email is None:
+            continue
+        if index in duplicates:
+            job = duplicates[index]
+            email = {**email, "job_title": job.get('role', email['job_title']), "job_description": job.get('description', email['job_description'])}
+        emails.append(email)
+    return emails
+
+def _record_campaign(campaign_store: Optional[CampaignStore], emails: List[Dict[str, Any]], source_url: Optional[str], tenant: str) -> None:
+    """Persist a request's emails to the campaign history without failing the request."""
+    if not campaign_store or not emails:
+        return
+    try:
+        campaign_store.record_emails(emails, source_url, tenant)
+    except Exception as e:
+        logger.error(f"Failed to record emails in campaign store: {e}")
+
+def _load_portfolio(portfolio: Portfolio) -> None:
+    try:
+        portfolio.load_portfolio()
+        logger.info("Portfolio loaded successfully")
+    except Exception as e:
+        logger.error(f"Failed to load portfolio: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load portfolio data")
+
+def _generate_emails_from_crawl(request: EmailRequest, agents: ColdEmailAgents, portfolio: Portfolio, tenant: str, deadline: Deadline, dedup_index: Optional[NearDuplicateIndex] = None, campaign_store: Optional[CampaignStore] = None) -> EmailResponse:
+    """Crawl a careers site and extract jobs from each detail page as soon as it is fetched."""
+    _load_portfolio(portfolio)
+    
+    crawler = CareersCrawler(
+        max_depth=CRAWL_MAX_DEPTH,
+        max_pages=min(request.max_pages or CRAWL_MAX_PAGES, CRAWL_MAX_PAGES),
+        per_host_concurrency=CRAWL_PER_HOST_CONCURRENCY,
+        politeness_delay=CRAWL_POLITENESS_DELAY
+    )
+    # Fetching continues in the background while earlier pages are being extracted
+    jobs = (
+        job
+        for page in crawler.crawl(request.url, deadline)
+        for job in agents.stream_jobs(page.text, deadline)
+    )
+    generated_emails = _generate_emails_pipelined(jobs, agents, portfolio, deadline, dedup_index, tenant)
+    
+    if not generated_emails:
+        return EmailResponse(
+            success=False,
+            message="No job postings found while crawling the provided URL",
+            emails=[],
+            total_jobs=0
+        )
+    
+    _record_campaign(campaign_store, generated_emails, request.url, tenant)
+    return EmailResponse(
+        success=True,
+        message=f"Successfully generated {len(generated_emails)} emails",
+        emails=generated_emails,
+        total_jobs=len(generated_emails)
+    )
+
+async def _cancel_on_disconnect(http_request: Request, deadline: Deadline) -> None:
+    """Cancel the request deadline as soon as the client goes away."""
+    while not deadline.expired:
+        if await http_request.is_disconnected():
+            deadline.cancel("client disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+def _generate_emails_sync(request: EmailRequest, agents: ColdEmailAgents, portfolios: TenantPortfolios, tenant: str, deadline: Deadline, dedup_index: Optional[NearDuplicateIndex] = None, campaign_store: Optional[CampaignStore] = None) -> EmailResponse:
+    """Blocking body of generate_emails; every stage checks the shared deadline before starting."""
+    # Validate input
+    if not request.url and not request.job_description:
+        raise HTTPException(status_code=400, detail="Either URL or job_description must be provided")
+    
+    # Resolve the tenant's portfolio first so an unknown tenant fails before any scraping
+    portfolio = _resolve_portfolio(portfolios, tenant)
+    
+    if request.url and request.crawl:
+        return _generate_emails_from_crawl(request, agents, portfolio, tenant, deadline, dedup_index, campaign_store)
+    
+    # Process input
+    if request.url:
+        try:
+            # Load and process data from URL
+            deadline.check("Scraping")
+            loader = WebBaseLoader([request.url], requests_kwargs={"timeout": deadline.remaining()})
+            raw_text = loader.load().pop().page_content
+            data = clean_text(raw_text)
+            logger.info(f"Successfully loaded content from URL: {request.url}")
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to load content from URL: {e}")
+            raise HTTPException(status_code=400, detail=f"Failed to load content from URL: {str(e)}")
+    else:
+        # Use the provided job description
+        raw_text = request.job_description
+        data = clean_text(raw_text)
+        logger.info("Using provided job description")
+    
+    # A re-posted page (new date, tracking params, reordered bullets) reuses the earlier emails.
+    # The raw text keeps its line breaks so each bullet is shingled on its own.
+    previous = dedup_index.find(raw_text, f"page:{tenant}") if dedup_index else None
+    if previous:
+        similarity, payload = previous
+        logger.info(f"Reusing emails from near-duplicate content (similarity {similarity:.2f})")
+        _record_campaign(campaign_store, payload['emails'], request.url, tenant)
+        return EmailResponse(
+            success=True,
+            message=f"Reused {len(payload['emails'])} emails from near-duplicate content",
+            emails=payload['emails'],
+            total_jobs=len(payload['emails'])
+        )
+    
+    # Load portfolio
+    _load_portfolio(portfolio)
+    
+    # Run the crew; if it fails or runs slow, every job's email is written as soon as
+    # the streamed extraction parses the job
+    def streamed_fallback(attempt_deadline: Deadline) -> List[Dict[str, Any]]:
+        return _generate_emails_pipelined(agents.stream_jobs(data, attempt_deadline), agents, portfolio, attempt_deadline, dedup_index, tenant)
+    
+    # The crew's portfolio task gets the tenant's closest projects for the page as a whole;
+    # the streamed fallback still matches each extracted job on its own skills
+    portfolio_matches = portfolio.query_links([data[:PORTFOLIO_QUERY_CHARS]])
+    workflow_result = agents.run_workflow(data, portfolio_matches, deadline, fallback=streamed_fallback)
+    logger.info("Complete workflow executed successfully")
+    
+    # Parse the workflow result
+    if isinstance(workflow_result, str):
+        generated_emails = [{
+            "job_title": "Extracted Role",
+            "job_description": data[:200] + "..." if len(data) > 200 else data,
+            "required_skills": [],
+            "experience_level": "Not specified",
+            "email_content": workflow_result,
+            "portfolio_matches": portfolio_matches,
+            "location": "Not specified",
+            "work_type": "Not specified"
+        }]
+    else:
+        generated_emails = [workflow_result] if not isinstance(workflow_result, list) else workflow_result
+    
+    if not generated_emails:
+        return EmailResponse(
+            success=False,
+            message="No job postings found in the provided content",
+            emails=[],
+            total_jobs=0
+        )
+    
+    # Only cache pages whose every email was actually written, so failures are retried next time
+    if dedup_index and all('error' not in email and _is_generated_email(email.get('email_content')) for email in generated_emails):
+        try:
+            dedup_index.add(raw_text, f"page:{tenant}", {"emails": generated_emails})
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not record emails in near-duplicate index: {e}")
+    _record_campaign(campaign_store, generated_emails, request.url, tenant)
+    
+    return EmailResponse(
+        success=True,
+        message=f"Successfully generated {len(generated_emails)} emails",
+        emails=generated_emails,
+        total_jobs=len(generated_emails)
+    )
 
 @router.post("/generate-emails", response_model=EmailResponse)
 async def generate_emails(
     request: EmailRequest,
+    http_request: Request,
     agents: ColdEmailAgents = Depends(get_agents),
-    portfolio: Portfolio = Depends(get_portfolio)
+    portfolios: TenantPortfolios = Depends(get_portfolios),
+    dedup_index: Optional[NearDuplicateIndex] = Depends(get_dedup_index),
+    campaign_store: Optional[CampaignStore] = Depends(get_optional_campaign_store)
 ):
     """
     Generate cold emails from job URL or description.
@@ -37,107 +318,26 @@ async def generate_emails(
     Returns:
         Generated cold emails for all found jobs
     """
+    tenant = request.tenant or http_request.headers.get("X-Tenant-ID") or DEFAULT_TENANT
+    budget = min(request.timeout_seconds or REQUEST_TIMEOUT_SECONDS, REQUEST_TIMEOUT_SECONDS)
+    deadline = Deadline(budget)
+    watcher = asyncio.create_task(_cancel_on_disconnect(http_request, deadline))
     try:
-        # Validate input
-        if not request.url and not request.job_description:
-            raise HTTPException(status_code=400, detail="Either URL or job_description must be provided")
-        
-        # Process input
-        if request.url:
-            try:
-                # Load and process data from URL
-                loader = WebBaseLoader([request.url])
-                page_content = loader.load().pop().page_content
-                data = clean_text(page_content)
-                logger.info(f"Successfully loaded content from URL: {request.url}")
-            except Exception as e:
-                logger.error(f"Failed to load content from URL: {e}")
-                raise HTTPException(status_code=400, detail=f"Failed to load content from URL: {str(e)}")
-        else:
-            # Use the provided job description
-            data = clean_text(request.job_description)
-            logger.info("Using provided job description")
-        
-        # Load portfolio
-        try:
-            portfolio.load_portfolio()
-            logger.info("Portfolio loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load portfolio: {e}")
-            raise HTTPException(status_code=500, detail="Failed to load portfolio data")
-        
-        # Use the complete workflow method for better coordination
-        try:
-            workflow_result = agents.process_complete_workflow(data, [])
-            logger.info("Complete workflow executed successfully")
-            
-            # Parse the workflow result
-            if isinstance(workflow_result, str):
-                generated_emails = [{
-                    "job_title": "Extracted Role",
-                    "job_description": data[:200] + "..." if len(data) > 200 else data,
-                    "required_skills": [],
-                    "experience_level": "Not specified",
-                    "email_content": workflow_result,
-                    "portfolio_matches": [],
-                    "location": "Not specified",
-                    "work_type": "Not specified"
-                }]
-            else:
-                generated_emails = [workflow_result] if not isinstance(workflow_result, list) else workflow_result
-            
-        except Exception as e:
-            logger.error(f"Workflow execution failed: {e}")
-            # Fallback to individual methods
-            jobs = agents.analyze_jobs(data)
-            
-            if not jobs:
-                return EmailResponse(
-                    success=False,
-                    message="No job postings found in the provided content",
-                    emails=[],
-                    total_jobs=0
-                )
-            
-            generated_emails = []
-            for job in jobs:
-                try:
-                    skills = job.get('skills', [])
-                    if isinstance(skills, str):
-                        skills = [s.strip() for s in skills.split(',') if s.strip()]
-                    portfolio_matches = portfolio.query_links(skills)
-                    
-                    email_content = agents.generate_cold_email(job, str(portfolio_matches))
-                    
-                    email_data = {
-                        "job_title": job.get('role', 'Unknown Role'),
-                        "job_description": job.get('description', ''),
-                        "required_skills": skills,
-                        "experience_level": job.get('experience', 'Not specified'),
-                        "email_content": email_content,
-                        "portfolio_matches": portfolio_matches,
-                        "location": job.get('location', 'Not specified'),
-                        "work_type": job.get('work_type', 'Not specified')
-                    }
-                    
-                    generated_emails.append(email_data)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing job {job.get('role', 'Unknown')}: {str(e)}")
-                    continue
-        
-        return EmailResponse(
-            success=True,
-            message=f"Successfully generated {len(generated_emails)} emails",
-            emails=generated_emails,
-            total_jobs=len(generated_emails)
+        return await asyncio.wait_for(
+            run_in_threadpool(_generate_emails_sync, request, agents, portfolios, tenant, deadline, dedup_index, campaign_store),
+            timeout=budget
         )
-        
+    except (DeadlineExceeded, asyncio.TimeoutError) as e:
+        deadline.cancel("time budget exhausted")
+        logger.error(f"Request abandoned: {e or 'time budget exhausted'}")
+        raise HTTPException(status_code=504, detail=f"Request exceeded its {budget:g}s time budget")
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Unexpected error in generate_emails: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating emails: {str(e)}")
+    finally:
+        watcher.cancel()
 
 @router.get("/")
 async def root():
@@ -148,6 +348,16 @@ async def root():
         "usage": "POST /api/generate-emails with URL or job_description"
     }
 
+@router.get("/prompt-templates")
+async def prompt_templates():
+    """Estimated static token count of each versioned prompt template and agent backstory."""
+    return {"templates": template_token_report()}
+
+@router.get("/tenants")
+async def tenant_stats(portfolios: TenantPortfolios = Depends(get_portfolios)):
+    """Loaded tenant portfolios, their estimated memory and usage counts."""
+    return portfolios.stats()
+
 @router.get("/health")
 async def health_check():
     return {"status": "ok"} 
\ No newline at end of file
@@ -1,9 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 
 class EmailRequest(BaseModel):
     url: Optional[str] = None
     job_description: Optional[str] = None
+    tenant: Optional[str] = Field(None, description="Business unit whose portfolio to use; the X-Tenant-ID header is used if omitted")
+    crawl: bool = Field(False, description="Treat url as a careers listing and follow pagination and job detail links")
+    max_pages: Optional[int] = Field(None, gt=0, description="Page cap for crawl mode; capped by the server limit")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="End-to-end time budget; capped by the server limit")
     
     class Config:
         schema_extra = {
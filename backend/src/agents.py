@@ -2,9 +2,18 @@ from crewai import Agent, Task, Crew, Process
 from langchain_groq import ChatGroq
 import os
 from dotenv import load_dotenv
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from functools import partial
 import logging
+import threading
+import time
+from src.json_stream import JsonObjectStreamParser, parse_json_objects
+from src.deadline import Deadline, DeadlineExceeded, LatencyTracker, run_in_thread
+from src.prompts import (
+    JOB_EXTRACTION, PORTFOLIO_MATCH, COLD_EMAIL, JOB_ANALYST_BACKSTORY, PORTFOLIO_ANALYST_BACKSTORY,
+    EMAIL_WRITER_BACKSTORY, TEAM_COORDINATOR_BACKSTORY, template_token_report
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +22,20 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Prefix of the placeholder returned instead of an email when generation fails
+EMAIL_GENERATION_FAILED = "Email generation failed"
+
+# Most crew runs (including abandoned ones still winding down) allowed at once; beyond
+# this, callers use the direct LLM path instead of starting another crew thread
+MAX_CREW_THREADS = int(os.getenv("MAX_CREW_THREADS", "8"))
+
+# How often a caller waiting on a crew re-checks its deadline for cancellation
+CANCEL_POLL_SECONDS = 0.5
+
+# Start the fast single-call path alongside the crew once the crew has run longer
+# than this percentile of its recent latencies. Unset or 0 disables hedging.
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0") or 0)
+
 class ColdEmailAgents:
     def __init__(self):
         # Set the API key as environment variable for CrewAI
@@ -35,27 +58,32 @@ class ColdEmailAgents:
             self.llm = "llama3-8b-8192"
             logger.info("Using string-based LLM configuration as fallback")
         
+        # Crew runs get their own threads (see run_in_thread) so callers can stop waiting at their deadline.
+        # Abandoned runs stop at their next agent step and are capped so they can't pile up under load.
+        self.crew_latency = LatencyTracker()
+        self._crew_slots = threading.BoundedSemaphore(MAX_CREW_THREADS)
+        self._crew_context = threading.local()
+        
         # Initialize agents
         self.job_analyst = self._create_job_analyst()
         self.portfolio_analyst = self._create_portfolio_analyst()
         self.email_writer = self._create_email_writer()
         self.team_coordinator = self._create_team_coordinator()
+        
+        logger.info(f"Prompt template token estimates: {template_token_report()}")
 
     def _create_job_analyst(self) -> Agent:
         """Creates an agent specialized in analyzing job postings and extracting key information."""
         return Agent(
             role='Job Analysis Specialist',
             goal='Extract and analyze job postings to identify key requirements, skills, and opportunities',
-            backstory="""You are an expert job analyst with years of experience in talent acquisition and 
-            recruitment. You excel at parsing through job descriptions, identifying key requirements, 
-            and understanding what companies are truly looking for in candidates. You have a deep 
-            understanding of various industries and can quickly identify the most important aspects 
-            of any job posting.""",
+            backstory=JOB_ANALYST_BACKSTORY,
             verbose=True,
             allow_delegation=False,
             llm=self.llm,
             max_iter=3,  # Limit iterations to prevent infinite loops
-            max_rpm=10   # Rate limiting
+            max_rpm=10,  # Rate limiting
+            step_callback=self._check_crew_deadline
         )
 
     def _create_portfolio_analyst(self) -> Agent:
@@ -63,16 +91,13 @@ class ColdEmailAgents:
         return Agent(
             role='Portfolio & Skills Analyst',
             goal='Analyze portfolio data and match agent skills with job requirements',
-            backstory="""You are a senior portfolio analyst who specializes in evaluating technical 
-            skills, project portfolios, and team capabilities. You have extensive experience in 
-            matching candidate skills with job requirements and can identify the best combinations 
-            of team members for specific projects. You understand both technical and business 
-            requirements and can assess collaboration potential between team members.""",
+            backstory=PORTFOLIO_ANALYST_BACKSTORY,
             verbose=True,
             allow_delegation=False,
             llm=self.llm,
             max_iter=3,
-            max_rpm=10
+            max_rpm=10,
+            step_callback=self._check_crew_deadline
         )
 
     def _create_email_writer(self) -> Agent:
@@ -80,16 +105,13 @@ class ColdEmailAgents:
         return Agent(
             role='Cold Email Specialist',
             goal='Write compelling, personalized cold emails that convert prospects into clients',
-            backstory="""You are SURESH BEEKHANI, a seasoned business development executive at Nexgenai. 
-            You have a proven track record of writing cold emails that generate high response rates. 
-            You understand the psychology of persuasion and know how to craft messages that resonate 
-            with potential clients. You excel at highlighting team capabilities, showcasing relevant 
-            portfolio work, and demonstrating clear value propositions.""",
+            backstory=EMAIL_WRITER_BACKSTORY,
             verbose=True,
             allow_delegation=False,
             llm=self.llm,
             max_iter=3,
-            max_rpm=10
+            max_rpm=10,
+            step_callback=self._check_crew_deadline
         )
 
     def _create_team_coordinator(self) -> Agent:
@@ -97,49 +119,60 @@ class ColdEmailAgents:
         return Agent(
             role='Project Coordinator',
             goal='Coordinate the entire process and ensure high-quality, cohesive output',
-            backstory="""You are a senior project coordinator with expertise in managing complex 
-            workflows and ensuring deliverables meet the highest standards. You excel at 
-            coordinating between different specialists, reviewing outputs for quality and 
-            consistency, and ensuring that the final product exceeds client expectations. 
-            You have a keen eye for detail and can spot opportunities for improvement.""",
+            backstory=TEAM_COORDINATOR_BACKSTORY,
             verbose=True,
             allow_delegation=True,
             llm=self.llm,
             max_iter=3,
-            max_rpm=10
+            max_rpm=10,
+            step_callback=self._check_crew_deadline
         )
 
-    def analyze_jobs(self, cleaned_text: str) -> List[Dict[str, Any]]:
+    def _kickoff(self, crew: Crew, deadline: Optional[Deadline], stage: str):
+        """Run a crew, giving up once the deadline passes instead of blocking past it."""
+        if deadline is None:
+            return crew.kickoff()
+        
+        deadline.check(stage)
+        if not self._crew_slots.acquire(blocking=False):
+            # Callers fall back to a direct LLM call, which honours the deadline itself
+            raise RuntimeError(f"{stage} skipped: {MAX_CREW_THREADS} crew runs already in flight")
+        future = run_in_thread(self._run_crew, crew, deadline, stage, name=f"crew-{stage}")
+        while True:
+            done, _ = wait([future], timeout=min(deadline.remaining(), CANCEL_POLL_SECONDS))
+            if done:
+                return future.result()
+            # CrewAI can't be interrupted mid-call; the abandoned run stops at its next agent step
+            deadline.check(stage)
+
+    def _run_crew(self, crew: Crew, deadline: Deadline, stage: str):
+        """Body of a crew thread: expose the deadline to the agents' step callback and free the slot when done."""
+        self._crew_context.deadline = deadline
+        self._crew_context.stage = stage
+        try:
+            return crew.kickoff()
+        finally:
+            self._crew_slots.release()
+
+    def _check_crew_deadline(self, step: Any) -> None:
+        """Agent step callback: abort a crew whose deadline expired or was cancelled before its next LLM call."""
+        deadline = getattr(self._crew_context, 'deadline', None)
+        if deadline is not None:
+            deadline.check(self._crew_context.stage)
+
+    def _invoke_llm(self, prompt: str, deadline: Optional[Deadline], stage: str):
+        """Call the LLM directly, bounding the HTTP request by the remaining budget."""
+        if deadline is None:
+            return self.llm.invoke(prompt)
+        
+        deadline.check(stage)
+        return self.llm.invoke(prompt, timeout=deadline.remaining())
+
+    def analyze_jobs(self, cleaned_text: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
         """Extract and analyze job postings from cleaned text."""
         try:
             task = Task(
-                description=f"""
-                Analyze the following scraped text from a careers page and extract job postings.
-                
-                TEXT TO ANALYZE:
-                {cleaned_text}
-                
-                Your task is to:
-                1. Identify all job postings in the text
-                2. Extract key information for each job:
-                   - Role/Position title
-                   - Required experience level
-                   - Required skills (technical and soft skills)
-                   - Job description
-                   - Company information (if available)
-                3. Return the data in a structured JSON format
-                4. Ensure all extracted information is accurate and complete
-                
-                Return only valid JSON with the following structure:
-                [
-                    {{
-                        "role": "Job Title",
-                        "experience": "Experience Level",
-                        "skills": ["skill1", "skill2", "skill3"],
-                        "description": "Detailed job description"
-                    }}
-                ]
-                """,
+                description=JOB_EXTRACTION.render(text=cleaned_text),
                 agent=self.job_analyst,
                 expected_output="A JSON array containing structured job posting data"
             )
@@ -151,32 +184,26 @@ class ColdEmailAgents:
                 process=Process.sequential
             )
 
-            result = crew.kickoff()
+            result = self._kickoff(crew, deadline, "Job analysis")
             
-            try:
-                # Parse the result to extract JSON
-                if isinstance(result, str):
-                    # Try to find JSON in the result
-                    start_idx = result.find('[')
-                    end_idx = result.rfind(']') + 1
-                    if start_idx != -1 and end_idx != 0:
-                        json_str = result[start_idx:end_idx]
-                        return json.loads(json_str)
-                    else:
-                        # If no JSON found, return empty list
-                        return []
-                else:
-                    return result if isinstance(result, list) else [result]
-            except json.JSONDecodeError:
+            if isinstance(result, list):
+                return result
+
+            # Recover every complete job object, even from a truncated or malformed tail
+            raw = getattr(result, 'raw', None) or str(result)
+            jobs = parse_json_objects(raw)
+            if not jobs:
                 logger.error("Failed to parse JSON from CrewAI result")
-                return []
+            return jobs
                 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"CrewAI job analysis failed: {e}")
             # Fallback to direct LLM call
-            return self._fallback_analyze_jobs(cleaned_text)
+            return self._fallback_analyze_jobs(cleaned_text, deadline)
 
-    def _fallback_analyze_jobs(self, cleaned_text: str) -> List[Dict[str, Any]]:
+    def _fallback_analyze_jobs(self, cleaned_text: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
         """Fallback method using direct LLM calls when CrewAI fails."""
         try:
             if isinstance(self.llm, str):
@@ -184,66 +211,63 @@ class ColdEmailAgents:
                 logger.error("Cannot use fallback method with string-based LLM")
                 return []
             
-            prompt = f"""
-            Analyze the following job posting text and extract key information in JSON format.
-            
-            TEXT: {cleaned_text}
-            
-            Return a JSON array with this structure:
-            [
-                {{
-                    "role": "Job Title",
-                    "experience": "Experience Level", 
-                    "skills": ["skill1", "skill2", "skill3"],
-                    "description": "Job description"
-                }}
-            ]
-            
-            Return only valid JSON.
-            """
-            
-            response = self.llm.invoke(prompt)
+            response = self._invoke_llm(self._job_extraction_prompt(cleaned_text), deadline, "Job analysis")
             content = response.content if hasattr(response, 'content') else str(response)
             
-            # Extract JSON from response
-            start_idx = content.find('[')
-            end_idx = content.rfind(']') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
+            # Extract JSON objects from response
+            jobs = parse_json_objects(content)
+            if not jobs:
                 logger.error("No valid JSON found in LLM response")
-                return []
+            return jobs
                 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Fallback job analysis failed: {e}")
             return []
 
+    def _job_extraction_prompt(self, cleaned_text: str) -> str:
+        """Build the direct-LLM prompt used to extract job postings as a JSON array."""
+        # Same template as the crew task so both share a cacheable prefix
+        return JOB_EXTRACTION.render(text=cleaned_text)
+
+    def stream_jobs(self, cleaned_text: str, deadline: Optional[Deadline] = None) -> Iterator[Dict[str, Any]]:
+        """Yield job postings one at a time as the LLM finishes writing each JSON object."""
+        if isinstance(self.llm, str):
+            # String-based LLMs can't stream, so fall back to the blocking extraction
+            yield from self.analyze_jobs(cleaned_text, deadline)
+            return
+
+        parser = JsonObjectStreamParser()
+        yielded = 0
+        kwargs = {}
+        if deadline is not None:
+            deadline.check("Job analysis")
+            kwargs["timeout"] = deadline.remaining()
+        stream = self.llm.stream(self._job_extraction_prompt(cleaned_text), **kwargs)
+        try:
+            for chunk in stream:
+                if deadline is not None:
+                    deadline.check("Job analysis")
+                content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                for job in parser.feed(content):
+                    yielded += 1
+                    yield job
+            parser.close()
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming job analysis failed after {yielded} jobs: {e}")
+            if not yielded:
+                yield from self._fallback_analyze_jobs(cleaned_text, deadline)
+        finally:
+            # Closing the generator drops the underlying HTTP stream
+            stream.close()
+
     def analyze_portfolio_match(self, job: Dict[str, Any], portfolio_links: List[str]) -> Dict[str, Any]:
         """Analyze portfolio data and match with job requirements."""
         task = Task(
-            description=f"""
-            Analyze the job requirements and portfolio data to create the best team match.
-            
-            JOB REQUIREMENTS:
-            {json.dumps(job, indent=2)}
-            
-            PORTFOLIO LINKS:
-            {portfolio_links}
-            
-            Your task is to:
-            1. Analyze the job requirements and identify key skills needed
-            2. Review the portfolio data and identify relevant projects/experience
-            3. Determine if this is a single-agent or team opportunity
-            4. If team opportunity, identify complementary skill sets
-            5. Create a comprehensive analysis including:
-               - Skill match percentage
-               - Relevant portfolio projects
-               - Team composition recommendations
-               - Value proposition highlights
-            
-            Return a structured analysis that can be used for email generation.
-            """,
+            description=PORTFOLIO_MATCH.render(job=job, portfolio=portfolio_links),
             agent=self.portfolio_analyst,
             expected_output="A comprehensive analysis of portfolio-job match with team recommendations"
         )
@@ -257,36 +281,11 @@ class ColdEmailAgents:
 
         return crew.kickoff()
 
-    def generate_cold_email(self, job: Dict[str, Any], portfolio_analysis: str) -> str:
-        """Generate a compelling cold email based on job and portfolio analysis."""
+    def generate_cold_email(self, job: Dict[str, Any], portfolio_analysis: Any, deadline: Optional[Deadline] = None) -> str:
+        """Generate a compelling cold email; pass portfolio matches as a list so they render as compact JSON."""
         try:
             task = Task(
-                description=f"""
-                Write a compelling cold email as SURESH BEEKHANI, BDE at Nexgenai.
-                
-                JOB INFORMATION:
-                {json.dumps(job, indent=2)}
-                
-                PORTFOLIO ANALYSIS:
-                {portfolio_analysis}
-                
-                Your task is to write a professional cold email that:
-                1. Introduces Nexgenai as an AI & Software Consulting company
-                2. Addresses the specific job requirements
-                3. Highlights relevant portfolio work and team capabilities
-                4. Demonstrates clear value proposition
-                5. Includes a compelling call-to-action
-                6. Maintains professional tone while being engaging
-                
-                Key points to include:
-                - Nexgenai's expertise in AI & Software Consulting
-                - Relevant experience and portfolio projects
-                - Team capabilities and collaboration benefits
-                - Specific value propositions for the client
-                - Clear next steps or call-to-action
-                
-                Write the email in a professional business format with proper greeting and closing.
-                """,
+                description=COLD_EMAIL.render(job=job, portfolio=portfolio_analysis),
                 agent=self.email_writer,
                 expected_output="A compelling cold email ready to send to the prospect"
             )
@@ -298,58 +297,105 @@ class ColdEmailAgents:
                 process=Process.sequential
             )
 
-            result = crew.kickoff()
-            return str(result) if result else "Email generation failed"
+            result = self._kickoff(crew, deadline, "Email generation")
+            return str(result) if result else EMAIL_GENERATION_FAILED
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"CrewAI email generation failed: {e}")
             # Fallback to direct LLM call
-            return self._fallback_generate_email(job, portfolio_analysis)
+            return self._fallback_generate_email(job, portfolio_analysis, deadline)
 
-    def _fallback_generate_email(self, job: Dict[str, Any], portfolio_analysis: str) -> str:
+    def _fallback_generate_email(self, job: Dict[str, Any], portfolio_analysis: Any, deadline: Optional[Deadline] = None) -> str:
         """Fallback method for email generation using direct LLM calls."""
         try:
             if isinstance(self.llm, str):
                 logger.error("Cannot use fallback method with string-based LLM")
-                return "Email generation failed - system error"
-            
-            prompt = f"""
-            Write a professional cold email as SURESH BEEKHANI, BDE at Nexgenai.
-            
-            JOB: {json.dumps(job, indent=2)}
-            PORTFOLIO: {portfolio_analysis}
+                return f"{EMAIL_GENERATION_FAILED} - system error"
             
-            Write a compelling cold email that:
-            1. Introduces Nexgenai as an AI & Software Consulting company
-            2. Addresses the specific job requirements
-            3. Highlights relevant portfolio work and team capabilities
-            4. Demonstrates clear value proposition
-            5. Includes a compelling call-to-action
+            prompt = COLD_EMAIL.render(job=job, portfolio=portfolio_analysis)
             
-            Write in professional business format with proper greeting and closing.
-            """
-            
-            response = self.llm.invoke(prompt)
+            response = self._invoke_llm(prompt, deadline, "Email generation")
             content = response.content if hasattr(response, 'content') else str(response)
             return content
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Fallback email generation failed: {e}")
-            return "Email generation failed - system error"
+            return f"{EMAIL_GENERATION_FAILED} - system error"
+
+    def run_workflow(self, cleaned_text: str, portfolio_links: List[str], deadline: Deadline,
+                     fallback: Callable[[Deadline], Any]) -> Any:
+        """Run the crew workflow within the deadline, switching to ``fallback`` if it fails or runs slow.
+
+        ``fallback`` is called with its own child deadline. It starts as soon
+        as the crew fails, or, when hedging is enabled, once the crew has been
+        running longer than HEDGE_PERCENTILE of its recent latencies; whichever
+        attempt succeeds first wins. The loser's deadline is cancelled so it
+        stops at its next checkpoint.
+        """
+        futures: Dict[Future, Deadline] = {}
 
-    def process_complete_workflow(self, cleaned_text: str, portfolio_links: List[str]) -> Dict[str, Any]:
+        def start(target: Callable[[Deadline], Any], name: str) -> Future:
+            attempt_deadline = deadline.child()
+            future = run_in_thread(target, attempt_deadline, name=name)
+            futures[future] = attempt_deadline
+            return future
+
+        started = time.monotonic()
+        crew_future = start(partial(self.process_complete_workflow, cleaned_text, portfolio_links), "workflow")
+        fallback_future = None
+        hedge_after = self.crew_latency.percentile(HEDGE_PERCENTILE) if HEDGE_PERCENTILE else None
+        try:
+            while True:
+                # Check every attempt, including ones that finished before this pass
+                finished = [future for future in futures if future.done()]
+                for future in finished:
+                    if future.exception() is None:
+                        return future.result()
+                deadline.check("Workflow")
+
+                if fallback_future is None:
+                    if crew_future in finished:
+                        logger.error(f"Crew workflow failed, switching to fallback: {crew_future.exception()}")
+                        fallback_future = start(fallback, "workflow-fallback")
+                        continue
+                    elif hedge_after is not None and time.monotonic() - started >= hedge_after:
+                        logger.info(f"Crew exceeded p{HEDGE_PERCENTILE:g} latency ({hedge_after:.1f}s), starting hedged fallback")
+                        fallback_future = start(fallback, "workflow-fallback")
+                        continue
+                elif crew_future in finished and fallback_future in finished:
+                    raise RuntimeError(
+                        f"All workflow attempts failed (crew: {crew_future.exception()}; fallback: {fallback_future.exception()})"
+                    )
+
+                timeout = min(deadline.remaining(), CANCEL_POLL_SECONDS)
+                if fallback_future is None and hedge_after is not None:
+                    timeout = min(timeout, max(0.0, started + hedge_after - time.monotonic()))
+                # Anything that finished since the check above makes wait() return at once
+                wait([future for future in futures if future not in finished], timeout=timeout, return_when=FIRST_COMPLETED)
+        finally:
+            # Stop whatever is still running; it will abort at its next deadline check
+            for future, attempt_deadline in futures.items():
+                if not future.done():
+                    future.cancel()
+                    attempt_deadline.cancel("superseded or out of time")
+
+    def process_complete_workflow(self, cleaned_text: str, portfolio_links: List[str], deadline: Optional[Deadline] = None) -> str:
         """Execute the complete workflow from job analysis to email generation."""
         try:
             # Task 1: Analyze jobs
             job_analysis_task = Task(
-                description=f"Extract and analyze job postings from the provided text: {cleaned_text[:500]}...",
+                description=JOB_EXTRACTION.render(text=cleaned_text[:500]),
                 agent=self.job_analyst,
                 expected_output="Structured job posting data in JSON format"
             )
 
             # Task 2: Analyze portfolio matches
             portfolio_task = Task(
-                description="Analyze portfolio data and match with job requirements",
+                description=PORTFOLIO_MATCH.render(job="See the job analysis from the previous task.", portfolio=portfolio_links),
                 agent=self.portfolio_analyst,
                 expected_output="Portfolio analysis with team recommendations",
                 context=[job_analysis_task]
@@ -378,45 +424,19 @@ class ColdEmailAgents:
                 process=Process.sequential
             )
 
-            result = crew.kickoff()
-            return result
+            if deadline is not None:
+                deadline.check("Workflow")
+            started = time.monotonic()
+            try:
+                result = self._kickoff(crew, deadline, "Workflow")
+            finally:
+                # Timed-out and superseded runs are recorded too (as a lower bound), otherwise
+                # the hedge percentile would only ever see the runs that were fast enough
+                self.crew_latency.record(time.monotonic() - started)
+            return getattr(result, 'raw', None) or str(result)
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Complete workflow failed: {e}")
-            # Fallback to simple workflow
-            return self._simple_workflow_fallback(cleaned_text, portfolio_links)
-
-    def _simple_workflow_fallback(self, cleaned_text: str, portfolio_links: List[str]) -> Dict[str, Any]:
-        """Simple fallback workflow when complex CrewAI workflow fails."""
-        try:
-            # Step 1: Analyze jobs using fallback method
-            jobs = self._fallback_analyze_jobs(cleaned_text)
-            
-            if not jobs:
-                return {
-                    "error": "No job postings found",
-                    "email_content": "Unable to generate email - no job information found"
-                }
-            
-            # Step 2: Generate email for the first job found
-            job = jobs[0] if isinstance(jobs, list) else jobs
-            
-            # Step 3: Generate email using fallback method
-            email_content = self._fallback_generate_email(job, str(portfolio_links))
-            
-            return {
-                "job_title": job.get('role', 'Unknown Role'),
-                "job_description": job.get('description', ''),
-                "required_skills": job.get('skills', []),
-                "experience_level": job.get('experience', 'Not specified'),
-                "email_content": email_content,
-                "portfolio_matches": portfolio_links,
-                "workflow_type": "fallback"
-            }
-            
-        except Exception as e:
-            logger.error(f"Simple workflow fallback failed: {e}")
-            return {
-                "error": "Workflow failed",
-                "email_content": "Unable to generate email due to system error"
-            } 
\ No newline at end of file
+            raise
@@ -0,0 +1,176 @@
+import csv
+import hashlib
+import io
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns returned by queries and exports, in output order
+EXPORT_COLUMNS = (
+    'id', 'tenant', 'job_hash', 'role', 'source_url', 'experience_level', 'required_skills',
+    'job_description', 'email_content', 'portfolio_matches', 'location', 'work_type', 'created_at'
+)
+# Filters accepted by query/export, mapped to their indexed column
+FILTER_COLUMNS = ('tenant', 'job_hash', 'role', 'source_url')
+
+def job_hash(email: Dict[str, Any]) -> str:
+    """Stable hash of the extracted job an email was written for."""
+    skills = email.get('required_skills') or []
+    key = {
+        'role': str(email.get('job_title', '')).strip().lower(),
+        'description': ' '.join(str(email.get('job_description', '')).lower().split()),
+        'skills': sorted(str(s).strip().lower() for s in skills) if isinstance(skills, list) else str(skills),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+class CampaignStore:
+    """SQLite history of every extraction and email produced by generate_emails.
+
+    Rows are written in bulk, one transaction per request or batch. Reads use
+    keyset pagination on the row id, so both paged queries and full exports
+    cost the same per page no matter how deep they go, and exports only hold
+    one page of rows in memory.
+    """
+
+    def __init__(self, db_path: str = "src/campaigns.sqlite3"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS emails (
+                id INTEGER PRIMARY KEY,
+                tenant TEXT NOT NULL DEFAULT 'default',
+                job_hash TEXT NOT NULL,
+                role TEXT NOT NULL,
+                source_url TEXT,
+                experience_level TEXT,
+                required_skills TEXT,
+                job_description TEXT,
+                email_content TEXT,
+                portfolio_matches TEXT,
+                location TEXT,
+                work_type TEXT,
+                created_at REAL NOT NULL
+            );
+        """)
+        # Stores created before multi-tenancy lack the tenant column
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(emails)")}
+        if 'tenant' not in columns:
+            self._conn.execute("ALTER TABLE emails ADD COLUMN tenant TEXT NOT NULL DEFAULT 'default'")
+        self._conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_emails_tenant ON emails (tenant, id);
+            CREATE INDEX IF NOT EXISTS idx_emails_job_hash ON emails (job_hash, id);
+            CREATE INDEX IF NOT EXISTS idx_emails_role ON emails (role, id);
+            CREATE INDEX IF NOT EXISTS idx_emails_source_url ON emails (source_url, id);
+            CREATE INDEX IF NOT EXISTS idx_emails_created_at ON emails (created_at);
+        """)
+        logger.info(f"Campaign store opened at {db_path}")
+
+    def record_emails(self, emails: List[Dict[str, Any]], source_url: Optional[str] = None, tenant: str = "default") -> int:
+        """Bulk insert generated emails in a single transaction; returns the number written."""
+        now = time.time()
+        rows = [
+            (
+                tenant,
+                job_hash(email),
+                str(email.get('job_title', 'Unknown Role')),
+                source_url,
+                str(email.get('experience_level', '')),
+                _dumps(email.get('required_skills', [])),
+                str(email.get('job_description', '')),
+                str(email.get('email_content', '')),
+                _dumps(email.get('portfolio_matches', [])),
+                str(email.get('location', '')),
+                str(email.get('work_type', '')),
+                now,
+            )
+            for email in emails
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO emails (tenant, job_hash, role, source_url, experience_level, required_skills,
+                       job_description, email_content, portfolio_matches, location, work_type, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+        return len(rows)
+
+    def _page(self, filters: Dict[str, Any], after_id: Optional[int], limit: int, since: Optional[float]) -> List[sqlite3.Row]:
+        clauses, params = [], []
+        for column in FILTER_COLUMNS:
+            if filters.get(column) is not None:
+                clauses.append(f"{column} = ?")
+                params.append(filters[column])
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if after_id is not None:
+            clauses.append("id < ?")
+            params.append(after_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {', '.join(EXPORT_COLUMNS)} FROM emails {where} ORDER BY id DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+
+    def query(self, limit: int = 50, cursor: Optional[int] = None, since: Optional[float] = None, **filters) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Return one page of emails (newest first) and the cursor for the next page, if any."""
+        rows = self._page(filters, cursor, limit + 1, since)
+        next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+        return [self._to_dict(row) for row in rows[:limit]], next_cursor
+
+    def iter_rows(self, batch_size: int = 1000, since: Optional[float] = None, **filters) -> Iterator[Dict[str, Any]]:
+        """Yield every matching email, fetching one keyset page at a time."""
+        cursor = None
+        while True:
+            rows = self._page(filters, cursor, batch_size, since)
+            for row in rows:
+                yield self._to_dict(row)
+            if len(rows) < batch_size:
+                return
+            cursor = rows[-1]['id']
+
+    def export_csv(self, **filters) -> Iterator[str]:
+        """Stream matching emails as CSV text, one row per chunk."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in self.iter_rows(**filters):
+            writer.writerow([_dumps(row[c]) if isinstance(row[c], list) else row[c] for c in EXPORT_COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    def export_jsonl(self, **filters) -> Iterator[str]:
+        """Stream matching emails as JSON Lines."""
+        for row in self.iter_rows(**filters):
+            yield _dumps(row) + "\n"
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        for column in ('required_skills', 'portfolio_matches'):
+            try:
+                record[column] = json.loads(record[column]) if record[column] else []
+            except json.JSONDecodeError:
+                pass
+        return record
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,252 @@
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.robotparser import RobotFileParser
+import logging
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from src.deadline import Deadline
+from src.utils import clean_text
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ColdEmailAutomationBot/1.0"
+
+# Link heuristics for typical careers sites
+_DETAIL_PATH = re.compile(r"/(jobs?|careers?|positions?|openings?|vacanc(y|ies)|roles?)/[^/?#]+", re.I)
+_PAGINATION_HREF = re.compile(r"[?&](page|p|pg|offset|start)=\d+|/page/\d+/?$", re.I)
+_PAGINATION_TEXT = re.compile(r"^\s*(next|more|older|\d+|›|»|>)\s*$", re.I)
+
+class CrawledPage:
+    """A job detail page fetched by the crawler."""
+    __slots__ = ('url', 'text', 'depth')
+
+    def __init__(self, url: str, text: str, depth: int):
+        self.url = url
+        self.text = text
+        self.depth = depth
+
+    def __repr__(self) -> str:
+        return f"CrawledPage(url={self.url!r}, depth={self.depth})"
+
+class _HostLimiter:
+    """Caps concurrent requests and enforces a minimum delay between requests to one host."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.slots = threading.Semaphore(concurrency)
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_request = 0.0
+
+    def __enter__(self):
+        self.slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_request - now
+            self._next_request = max(now, self._next_request) + self.delay
+        if wait_for > 0:
+            time.sleep(wait_for)
+        return self
+
+    def __exit__(self, *exc):
+        self.slots.release()
+
+class CareersCrawler:
+    """Crawl a careers listing, following pagination and job detail links on the same host.
+
+    Listing pages are followed through pagination up to ``max_depth`` hops,
+    and every job detail link they contain is fetched once. Fetches run
+    concurrently over a pooled ``requests.Session``, limited per host by
+    ``per_host_concurrency`` and ``politeness_delay`` and overall by
+    ``max_pages`` successful fetches. ``crawl`` yields detail pages as soon as each one arrives so
+    extraction can start before the crawl finishes. If a listing has no
+    recognisable detail links, the listing page itself is yielded.
+    """
+
+    def __init__(self, max_depth: int = 3, max_pages: int = 50, max_workers: int = 8,
+                 per_host_concurrency: int = 2, politeness_delay: float = 0.5, timeout: float = 15,
+                 respect_robots: bool = True, session: Optional[requests.Session] = None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.politeness_delay = politeness_delay
+        self.timeout = timeout
+        self.respect_robots = respect_robots
+        self.session = session or self._create_session()
+        self._limiters: Dict[str, _HostLimiter] = {}
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers, max_retries=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def crawl(self, start_url: str, deadline: Optional[Deadline] = None) -> Iterator[CrawledPage]:
+        """Yield job detail pages reachable from start_url as they are fetched."""
+        host = urlparse(start_url).netloc
+        seen: Set[str] = {self._normalize(start_url)}
+        # Only pages that were actually fetched count toward max_pages; robots-disallowed
+        # and failed fetches free their slot for the next queued link
+        fetched = 0
+        yielded = 0
+        queue: Deque[Tuple[str, int, bool]] = deque([(start_url, 0, True)])
+        # future -> (url, depth, is_listing)
+        pending: Dict = {}
+        listing_fallbacks: List[CrawledPage] = []
+
+        def enqueue(links: List[str], depth: int, is_listing: bool) -> None:
+            for link in links:
+                if self._normalize(link) not in seen:
+                    seen.add(self._normalize(link))
+                    queue.append((link, depth, is_listing))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawler") as executor:
+            try:
+                while True:
+                    if deadline is None or not deadline.expired:
+                        while queue and fetched + len(pending) < self.max_pages:
+                            url, depth, is_listing = queue.popleft()
+                            pending[executor.submit(self._fetch, url, deadline)] = (url, depth, is_listing)
+                    if not pending:
+                        break
+
+                    timeout = deadline.remaining() if deadline is not None else None
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    if not done:
+                        logger.warning(f"Crawl of {start_url} stopped at deadline after {fetched} pages")
+                        break
+                    for future in done:
+                        url, depth, is_listing = pending.pop(future)
+                        html = future.result()
+                        if html is None:
+                            continue
+                        fetched += 1
+                        if not is_listing:
+                            yielded += 1
+                            yield CrawledPage(url, self._page_text(html), depth)
+                            continue
+
+                        next_pages, details = self._discover_links(html, url, host)
+                        if not details:
+                            listing_fallbacks.append(CrawledPage(url, self._page_text(html), depth))
+                        enqueue(details, depth + 1, False)
+                        if depth < self.max_depth:
+                            enqueue(next_pages, depth + 1, True)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        if not yielded:
+            # Single-page listings keep their full content on the listing itself
+            yield from listing_fallbacks
+        logger.info(f"Crawled {fetched} pages from {start_url}, {yielded} job detail pages")
+
+    def _fetch(self, url: str, deadline: Optional[Deadline]) -> Optional[str]:
+        if deadline is not None and deadline.expired:
+            return None
+        if not self._allowed(url, deadline):
+            logger.info(f"Skipping {url}: disallowed by robots.txt")
+            return None
+        try:
+            with self._limiter(urlparse(url).netloc):
+                response = self.session.get(url, timeout=self._timeout(deadline))
+            response.raise_for_status()
+            # Some servers label HTML as octet-stream, so sniff the body as well
+            content_type = response.headers.get('Content-Type', 'text/html')
+            if 'html' not in content_type and response.text.lstrip()[:1] != '<':
+                return None
+            return response.text
+        except requests.RequestException as e:
+            logger.warning(f"Failed to fetch {url}: {e}")
+            return None
+
+    def _limiter(self, host: str) -> _HostLimiter:
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = _HostLimiter(self.per_host_concurrency, self.politeness_delay)
+            return limiter
+
+    def _timeout(self, deadline: Optional[Deadline]) -> float:
+        return self.timeout if deadline is None else min(self.timeout, max(deadline.remaining(), 0.1))
+
+    def _allowed(self, url: str, deadline: Optional[Deadline] = None) -> bool:
+        if not self.respect_robots:
+            return True
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            origin_lock = self._robots_locks.setdefault(origin, threading.Lock())
+        # One robots.txt fetch per origin; concurrent fetches for the same origin wait for it
+        with origin_lock:
+            if origin not in self._robots:
+                self._robots[origin] = self._fetch_robots(origin, deadline)
+            parser = self._robots[origin]
+        return parser is None or parser.can_fetch(USER_AGENT, url)
+
+    def _fetch_robots(self, origin: str, deadline: Optional[Deadline]) -> Optional[RobotFileParser]:
+        """Fetch and parse an origin's robots.txt under the same deadline and host limits as pages."""
+        try:
+            with self._limiter(urlparse(origin).netloc):
+                response = self.session.get(f"{origin}/robots.txt", timeout=self._timeout(deadline))
+        except requests.RequestException as e:
+            logger.info(f"Could not fetch robots.txt for {origin}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        return parser
+
+    @staticmethod
+    def _normalize(url: str) -> str:
+        return urldefrag(url)[0].rstrip('/')
+
+    @staticmethod
+    def _page_text(html: str) -> str:
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(['script', 'style', 'noscript', 'nav', 'footer', 'header']):
+            tag.decompose()
+        return clean_text(soup.get_text(' '))
+
+    @classmethod
+    def _discover_links(cls, html: str, page_url: str, host: str) -> Tuple[List[str], List[str]]:
+        """Split a listing page's same-host links into (pagination links, job detail links)."""
+        soup = BeautifulSoup(html, 'html.parser')
+        next_pages, details = [], []
+        page_key = cls._normalize(page_url)
+        for anchor in soup.find_all(['a', 'link'], href=True):
+            url = urldefrag(urljoin(page_url, anchor['href']))[0]
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or parsed.netloc != host or cls._normalize(url) == page_key:
+                continue
+
+            rel = ' '.join(anchor.get('rel') or []).lower()
+            classes = ' '.join(anchor.get('class') or []).lower()
+            in_pagination = any(
+                'pagination' in ' '.join(parent.get('class') or []).lower() or parent.get('aria-label', '').lower() == 'pagination'
+                for parent in anchor.parents if parent.name
+            )
+            if anchor.name == 'link' and rel != 'next':
+                continue
+            if (rel == 'next' or 'next' in classes or in_pagination or _PAGINATION_HREF.search(url)
+                    or (_PAGINATION_TEXT.match(anchor.get_text()) and not _DETAIL_PATH.search(parsed.path))):
+                next_pages.append(url)
+            elif _DETAIL_PATH.search(parsed.path):
+                details.append(url)
+        return next_pages, details
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Optional
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of time budget or is cancelled."""
+
+class Deadline:
+    """Per-request time budget shared by every stage of the email workflow.
+
+    Stages call ``check()`` before starting expensive work and pass
+    ``remaining()`` on as the timeout of blocking LLM and HTTP calls. A deadline
+    can also be cancelled explicitly, e.g. when the client disconnects, which
+    makes every later check fail immediately.
+    """
+
+    def __init__(self, budget_seconds: float, parent: Optional["Deadline"] = None):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._cancelled = threading.Event()
+
+    def child(self, budget_seconds: Optional[float] = None) -> "Deadline":
+        """Create a deadline that expires no later than this one but can be cancelled on its own."""
+        return Deadline(self.remaining() if budget_seconds is None else budget_seconds, parent=self)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._cancelled.is_set():
+            self.reason = reason
+            self._cancelled.set()
+            logger.info(f"Request deadline cancelled: {reason}")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() >= self.expires_at
+
+    def remaining(self) -> float:
+        """Seconds left in the budget, or 0 once expired or cancelled."""
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self, stage: str = "") -> None:
+        """Raise DeadlineExceeded if no budget is left for the given stage."""
+        if self.expired:
+            reason = self.reason or (self.parent.reason if self.parent else None) or "time budget exhausted"
+            raise DeadlineExceeded(f"{stage or 'Request'} aborted: {reason}")
+
+def run_in_thread(fn: Callable, *args, name: str = "worker") -> Future:
+    """Run fn on its own daemon thread and return a Future for its result.
+
+    Used for work that can't be interrupted, such as a crew kickoff: a caller
+    that gives up at its deadline leaves the thread to finish in the
+    background without tying up a worker in a shared pool.
+    """
+    future: Future = Future()
+
+    def runner():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, name=name, daemon=True).start()
+    return future
+
+class LatencyTracker:
+    """Rolling window of observed latencies used to decide when to hedge."""
+
+    def __init__(self, window: int = 100, min_samples: int = 5):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile latency, or None until enough samples are collected."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# MinHash signature length and LSH banding. 16 bands of 8 rows puts the LSH
+# candidate threshold at roughly (1/16) ** (1/8) ~= 0.71 Jaccard similarity,
+# comfortably below the default acceptance threshold.
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 5
+
+# Estimated Jaccard similarity above which earlier results are reused
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.85"))
+
+# Shingles never span these boundaries, so reordered lines, bullets and sentences still match
+_SEGMENT_BOUNDARY = re.compile(r'[\r\n]+|[.!?;•·▪●◦]+(?=\s|$)|\s[-*–]\s')
+# Posting dates, timestamps and long ids change between re-posts; other numbers (e.g. "5+ years") are kept
+_VOLATILE_TOKENS = re.compile(
+    r'\S+://\S+|\S+\?\S+=\S*'
+    r'|\b\d{4}-\d{1,2}-\d{1,2}(t[\d:.]+z?)?\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b|\b\d{1,2}:\d{2}(:\d{2})?\b'
+    r'|\b\d{1,2}(st|nd|rd|th)?\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?(\s+\d{4})?\b'
+    r'|\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}(st|nd|rd|th)?(,?\s+\d{4})?\b'
+    r'|\b\d{6,}\b'
+)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _make_permutations(count: int) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) coefficients so signatures stay comparable across restarts."""
+    params = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        params.append((a % (_MERSENNE_PRIME - 1) + 1, b % _MERSENNE_PRIME))
+    return params
+
+_PERMUTATIONS = _make_permutations(NUM_PERMUTATIONS)
+
+def normalize_for_dedup(text: str) -> str:
+    """Lowercase and drop URLs, tracking params, dates, long ids and punctuation."""
+    text = _VOLATILE_TOKENS.sub(' ', text.lower())
+    text = re.sub(r'[^\w\s+#]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word shingles taken within each line or sentence; segments shorter than size count as one shingle."""
+    result = set()
+    for segment in _SEGMENT_BOUNDARY.split(text):
+        words = normalize_for_dedup(segment).split()
+        if len(words) <= size:
+            if words:
+                result.add(' '.join(words))
+            continue
+        result.update(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+    return result
+
+def minhash_signature(text: str) -> Tuple[int, ...]:
+    """Compute the MinHash signature of a text's shingle set."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+        for s in shingles(text)
+    ]
+    if not hashes:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+def signature_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+def _band_keys(signature: Tuple[int, ...]) -> List[str]:
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        keys.append(hashlib.blake2b(struct.pack(f"<{LSH_ROWS}I", *rows), digest_size=8).hexdigest())
+    return keys
+
+def _pack(signature: Tuple[int, ...]) -> bytes:
+    return struct.pack(f"<{NUM_PERMUTATIONS}I", *signature)
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{NUM_PERMUTATIONS}I", blob)
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of previously processed texts, persisted in SQLite.
+
+    Entries are grouped by ``kind`` (e.g. whole cleaned pages vs. single
+    extracted jobs) and carry a JSON payload with whatever was produced for
+    them, so a re-posted job with a new date or reordered bullets can reuse the
+    earlier extraction and email instead of calling the LLM again.
+    """
+
+    def __init__(self, db_path: str = "src/dedup.sqlite3", threshold: float = DEDUP_SIMILARITY_THRESHOLD):
+        self.db_path = db_path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                kind TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                doc_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_lsh_lookup ON lsh_buckets (kind, band, bucket);
+        """)
+        logger.info(f"Near-duplicate index opened at {db_path}")
+
+    def find(self, text: str, kind: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Return (similarity, payload) of the closest stored entry above the threshold, if any."""
+        signature = minhash_signature(text)
+        keys = _band_keys(signature)
+        clauses = " OR ".join(["(band = ? AND bucket = ?)"] * len(keys))
+        params = [kind] + [v for band, key in enumerate(keys) for v in (band, key)]
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT d.signature, d.payload FROM documents d
+                    WHERE d.id IN (SELECT doc_id FROM lsh_buckets WHERE kind = ? AND ({clauses}))""",
+                params
+            ).fetchall()
+
+        best = None
+        for blob, payload in rows:
+            similarity = signature_similarity(signature, _unpack(blob))
+            if similarity >= self.threshold and (best is None or similarity > best[0]):
+                best = (similarity, payload)
+        if best is None:
+            return None
+        return best[0], json.loads(best[1])
+
+    def add(self, text: str, kind: str, payload: Dict[str, Any]) -> None:
+        """Store a processed text and its results for later near-duplicate lookups."""
+        signature = minhash_signature(text)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO documents (kind, signature, payload, created_at) VALUES (?, ?, ?, ?)",
+                (kind, _pack(signature), json.dumps(payload, separators=(',', ':')), time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO lsh_buckets (kind, band, bucket, doc_id) VALUES (?, ?, ?, ?)",
+                [(kind, band, key, cursor.lastrowid) for band, key in enumerate(_band_keys(signature))]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class BatchDeduplicator:
+    """In-memory LSH used to collapse near-duplicates within a single batch before any LLM call.
+
+    Texts only match within the same ``group``, e.g. the same job title.
+    """
+
+    def __init__(self, threshold: float = DEDUP_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: List[Tuple[int, ...]] = []
+        self._buckets = defaultdict(list)
+
+    def match_or_add(self, text: str, group: str = "") -> Tuple[int, Optional[int]]:
+        """Register a text and return (its index, index of the earlier near-duplicate or None)."""
+        signature = minhash_signature(text)
+        keys = _band_keys(signature)
+        candidates = {i for band, key in enumerate(keys) for i in self._buckets[(group, band, key)]}
+        match = None
+        best = self.threshold
+        for i in sorted(candidates):
+            similarity = signature_similarity(signature, self._signatures[i])
+            if similarity >= best:
+                match, best = i, similarity
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        if match is None:
+            # Only representatives are bucketed so every duplicate maps to its first occurrence
+            for band, key in enumerate(keys):
+                self._buckets[(group, band, key)].append(index)
+        return index, match
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Flatten an extracted job into the text used for near-duplicate comparison, one field per line."""
+    skills = job.get('skills', [])
+    if isinstance(skills, list):
+        skills = ', '.join(sorted(str(s) for s in skills))
+    return f"{job.get('role', '')}\n{job.get('experience', '')}\n{skills}\n{job.get('description', '')}"
+
+def job_group(job: Dict[str, Any]) -> str:
+    """Normalized title and experience; jobs only match jobs with the same seniority and requirement."""
+    return f"{normalize_for_dedup(str(job.get('role', '')))}|{normalize_for_dedup(str(job.get('experience', '')))}"
@@ -0,0 +1,106 @@
+import json
+from typing import List, Dict, Any, Iterable, Iterator
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+class JsonObjectStreamParser:
+    """Incrementally extract top-level JSON objects from streamed LLM output.
+
+    Text is fed in arbitrary chunks. Every time a top-level ``{...}`` object is
+    closed it is decoded and returned, so callers can act on the first job of a
+    JSON array before the model has finished writing the rest. Prose, array
+    brackets and commas around the objects are ignored. An object that fails
+    to decode, or whose brackets don't match, is skipped and parsing resumes at
+    the next ``{`` instead of discarding everything else. A wrapper object with
+    a single array-valued key, e.g. ``{"jobs": [...]}``, yields its items.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        # Closing bracket expected for each open bracket of the current object
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self.skipped = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text and return any objects completed by it."""
+        completed = []
+        for char in chunk:
+            if not self._stack:
+                # Outside an object only an opening brace is significant
+                if char == '{':
+                    self._stack = ['}']
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(_CLOSERS[char])
+            elif char in '}]':
+                if char != self._stack[-1]:
+                    logger.warning(f"Skipping JSON object with mismatched {char!r} in stream")
+                    self.skipped += 1
+                    self._reset()
+                    continue
+                self._stack.pop()
+                if not self._stack:
+                    completed.extend(self._decode(''.join(self._buffer)))
+                    self._buffer = []
+        return completed
+
+    def close(self) -> None:
+        """Finish the stream, dropping any object left open by truncation."""
+        if self._stack:
+            logger.warning("Discarding truncated JSON object at end of stream")
+            self.skipped += 1
+        self._reset()
+
+    def _reset(self) -> None:
+        self._buffer = []
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+    def _decode(self, text: str) -> List[Dict[str, Any]]:
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed JSON object in stream: {e}")
+            self.skipped += 1
+            return []
+        if not isinstance(obj, dict):
+            return []
+        if len(obj) == 1:
+            (value,) = obj.values()
+            if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                return value
+        return [obj]
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield each top-level JSON object from a stream of text chunks as soon as it is complete."""
+    parser = JsonObjectStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+def parse_json_objects(text: str) -> List[Dict[str, Any]]:
+    """Recover every well-formed top-level JSON object from a (possibly truncated) response."""
+    return list(iter_json_objects([text]))
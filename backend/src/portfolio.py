@@ -1,112 +1,104 @@
-import pandas as pd
 import chromadb
+import csv
 import uuid
-import sqlite3
 from typing import List, Dict, Any
 import os
 import logging
+from src.portfolio_store import PortfolioStore, PortfolioRecord, PortfolioSchemaError
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of portfolio entries sent to ChromaDB per add() call
+VECTORSTORE_BATCH_SIZE = 1000
+
+# Rough in-memory cost of one embedded entry (384-dim float32 vector plus HNSW links and metadata)
+ESTIMATED_VECTOR_BYTES = 2048
+
 class Portfolio:
-    def __init__(self, file_path="resource/my_portfolio.csv"):
+    def __init__(self, file_path="resource/my_portfolio.csv", collection_name="portfolio", chroma_client=None):
         self.file_path = file_path
+        self.collection_name = collection_name
         self.data = self._load_portfolio_data()
         
         # Initialize ChromaDB with error handling
         try:
-            self.chroma_client = chromadb.PersistentClient('src/vectorstore')
-            self.collection = self.chroma_client.get_or_create_collection(name="portfolio")
+            # Tenants share one client so they don't each open the persistent store
+            self.chroma_client = chroma_client or chromadb.PersistentClient('src/vectorstore')
+            self.collection = self.chroma_client.get_or_create_collection(name=collection_name)
             logger.info("ChromaDB initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
 
-    def _load_portfolio_data(self) -> pd.DataFrame:
+    def _load_portfolio_data(self) -> PortfolioStore:
         """Load portfolio data with comprehensive error handling."""
         try:
             if os.path.exists(self.file_path):
-                data = pd.read_csv(self.file_path)
-                logger.info(f"Portfolio loaded from {self.file_path}")
+                data = PortfolioStore.load(self.file_path)
+                logger.info(f"Portfolio loaded from {self.file_path} ({len(data)} entries)")
+                if not len(data):
+                    logger.warning("Portfolio file has no valid entries, creating sample data")
+                    return self._create_sample_portfolio()
                 return data
             else:
                 logger.warning(f"Portfolio file not found at {self.file_path}, creating sample data")
                 return self._create_sample_portfolio()
-        except pd.errors.EmptyDataError:
-            logger.error("Portfolio file is empty, creating sample data")
+        except PortfolioSchemaError as e:
+            logger.error(f"Invalid portfolio file: {e}, creating sample data")
             return self._create_sample_portfolio()
-        except pd.errors.ParserError as e:
+        except (csv.Error, UnicodeDecodeError, ValueError) as e:
             logger.error(f"Error parsing portfolio file: {e}, creating sample data")
             return self._create_sample_portfolio()
         except Exception as e:
             logger.error(f"Unexpected error loading portfolio: {e}, creating sample data")
             return self._create_sample_portfolio()
 
-    def _create_sample_portfolio(self) -> pd.DataFrame:
+    def _create_sample_portfolio(self) -> PortfolioStore:
         """Create a sample portfolio with diverse skills and projects."""
-        sample_data = {
-            'Techstack': [
-                'Python, Machine Learning, Data Analysis, Pandas, Scikit-learn',
-                'JavaScript, React, Node.js, Full-stack Development, API Development',
-                'Python, Django, PostgreSQL, AWS, DevOps, CI/CD',
-                'Python, AI, Natural Language Processing, TensorFlow, PyTorch',
-                'JavaScript, Vue.js, TypeScript, UI/UX Design, Frontend Development',
-                'Python, Data Science, SQL, Tableau, Business Intelligence',
-                'Java, Spring Boot, Microservices, Docker, Kubernetes',
-                'Python, Automation, Selenium, Testing, Quality Assurance'
-            ],
-            'Links': [
-                'https://github.com/portfolio/ml-project-1',
-                'https://github.com/portfolio/fullstack-app',
-                'https://github.com/portfolio/django-ecommerce',
-                'https://github.com/portfolio/nlp-chatbot',
-                'https://github.com/portfolio/vue-dashboard',
-                'https://github.com/portfolio/data-analytics',
-                'https://github.com/portfolio/microservices-app',
-                'https://github.com/portfolio/automation-framework'
-            ],
-            'Experience': [
-                '3 years',
-                '5 years', 
-                '4 years',
-                '2 years',
-                '3 years',
-                '6 years',
-                '4 years',
-                '3 years'
-            ],
-            'Specialization': [
-                'Machine Learning Engineer',
-                'Full-stack Developer',
-                'Backend Developer',
-                'AI/ML Specialist',
-                'Frontend Developer',
-                'Data Scientist',
-                'Backend Engineer',
-                'QA Engineer'
-            ]
-        }
-        return pd.DataFrame(sample_data)
+        return PortfolioStore.from_records([
+            PortfolioRecord('Python, Machine Learning, Data Analysis, Pandas, Scikit-learn',
+                            'https://github.com/portfolio/ml-project-1', '3 years', 'Machine Learning Engineer'),
+            PortfolioRecord('JavaScript, React, Node.js, Full-stack Development, API Development',
+                            'https://github.com/portfolio/fullstack-app', '5 years', 'Full-stack Developer'),
+            PortfolioRecord('Python, Django, PostgreSQL, AWS, DevOps, CI/CD',
+                            'https://github.com/portfolio/django-ecommerce', '4 years', 'Backend Developer'),
+            PortfolioRecord('Python, AI, Natural Language Processing, TensorFlow, PyTorch',
+                            'https://github.com/portfolio/nlp-chatbot', '2 years', 'AI/ML Specialist'),
+            PortfolioRecord('JavaScript, Vue.js, TypeScript, UI/UX Design, Frontend Development',
+                            'https://github.com/portfolio/vue-dashboard', '3 years', 'Frontend Developer'),
+            PortfolioRecord('Python, Data Science, SQL, Tableau, Business Intelligence',
+                            'https://github.com/portfolio/data-analytics', '6 years', 'Data Scientist'),
+            PortfolioRecord('Java, Spring Boot, Microservices, Docker, Kubernetes',
+                            'https://github.com/portfolio/microservices-app', '4 years', 'Backend Engineer'),
+            PortfolioRecord('Python, Automation, Selenium, Testing, Quality Assurance',
+                            'https://github.com/portfolio/automation-framework', '3 years', 'QA Engineer'),
+        ])
 
     def load_portfolio(self):
         """Load portfolio data into the vector database."""
         if not self.collection.count():
-            for _, row in self.data.iterrows():
-                # Create a comprehensive document combining all portfolio information
-                portfolio_text = f"{row['Techstack']} {row.get('Specialization', '')} {row.get('Experience', '')}"
-                
-                self.collection.add(
-                    documents=[portfolio_text],
-                    metadatas=[{
-                        "links": row["Links"],
-                        "experience": row.get("Experience", ""),
-                        "specialization": row.get("Specialization", ""),
-                        "techstack": row["Techstack"]
-                    }],
-                    ids=[str(uuid.uuid4())]
-                )
+            # Add in batches rather than one round-trip per entry
+            batch = []
+            for record in self.data:
+                batch.append(record)
+                if len(batch) == VECTORSTORE_BATCH_SIZE:
+                    self._add_records(batch)
+                    batch = []
+            if batch:
+                self._add_records(batch)
+
+    def _add_records(self, records: List[PortfolioRecord]):
+        self.collection.add(
+            documents=[record.document() for record in records],
+            metadatas=[record.metadata() for record in records],
+            ids=[str(uuid.uuid4()) for _ in records]
+        )
+
+    def memory_usage(self) -> int:
+        """Estimated resident bytes for this portfolio's records and vector index entries."""
+        return self.data.nbytes + len(self.data) * ESTIMATED_VECTOR_BYTES
 
     def query_links(self, skills: List[str]) -> List[Dict[str, Any]]:
         """Query portfolio for relevant skills and return matching projects."""
@@ -141,15 +133,7 @@ class Portfolio:
 
     def get_agent_profiles(self) -> List[Dict[str, Any]]:
         """Get all agent profiles for team composition analysis."""
-        profiles = []
-        for _, row in self.data.iterrows():
-            profiles.append({
-                'specialization': row.get('Specialization', ''),
-                'experience': row.get('Experience', ''),
-                'techstack': row['Techstack'],
-                'portfolio_link': row['Links']
-            })
-        return profiles
+        return [record.to_profile() for record in self.data]
 
     def find_team_matches(self, job_requirements: Dict[str, Any]) -> Dict[str, Any]:
         """Find the best team composition for a given job."""
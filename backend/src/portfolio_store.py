@@ -0,0 +1,249 @@
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Column name in the portfolio file -> record attribute. Techstack and Links are required.
+PORTFOLIO_COLUMNS = {
+    'Techstack': 'techstack',
+    'Links': 'links',
+    'Experience': 'experience',
+    'Specialization': 'specialization',
+}
+REQUIRED_COLUMNS = ('Techstack', 'Links')
+FIELDS = tuple(PORTFOLIO_COLUMNS.values())
+
+SNAPSHOT_MAGIC = b"PFSNAP01"
+# magic, byte order flag, record count, field count
+_HEADER = struct.Struct("<8sBxxxII")
+
+class PortfolioSchemaError(ValueError):
+    """Raised when a portfolio file is malformed or missing required columns."""
+
+class PortfolioRecord:
+    """A single portfolio entry."""
+    __slots__ = FIELDS
+
+    def __init__(self, techstack: str, links: str, experience: str = "", specialization: str = ""):
+        self.techstack = techstack
+        self.links = links
+        self.experience = experience
+        self.specialization = specialization
+
+    def document(self) -> str:
+        """Text embedded in the vector store for this entry."""
+        return f"{self.techstack} {self.specialization} {self.experience}"
+
+    def metadata(self) -> Dict[str, str]:
+        return {
+            "links": self.links,
+            "experience": self.experience,
+            "specialization": self.specialization,
+            "techstack": self.techstack
+        }
+
+    def to_profile(self) -> Dict[str, str]:
+        return {
+            'specialization': self.specialization,
+            'experience': self.experience,
+            'techstack': self.techstack,
+            'portfolio_link': self.links
+        }
+
+    def __repr__(self) -> str:
+        return f"PortfolioRecord(techstack={self.techstack!r}, links={self.links!r})"
+
+class _StringColumn:
+    """Append-only column of strings packed into one UTF-8 buffer plus an offsets array."""
+
+    def __init__(self, offsets=None, data=None):
+        self.offsets = offsets if offsets is not None else array('I', [0])
+        self.data = data if data is not None else bytearray()
+
+    def append(self, value: str) -> None:
+        self.data += value.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+class PortfolioStore:
+    """Column-oriented, validated portfolio records.
+
+    Each field is stored as a single UTF-8 buffer with an offsets array, so
+    100k+ entries cost a few bytes of overhead each instead of a Python object
+    per cell. Records are materialised on access. A store can be written to a
+    binary snapshot and reopened via mmap without parsing the source file again.
+    """
+
+    def __init__(self, columns: Optional[Dict[str, _StringColumn]] = None, backing: Optional[mmap.mmap] = None):
+        self._columns = columns or {field: _StringColumn() for field in FIELDS}
+        self._backing = backing
+
+    def __len__(self) -> int:
+        return len(self._columns['links'].offsets) - 1
+
+    def __getitem__(self, index: int) -> PortfolioRecord:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("portfolio record index out of range")
+        return PortfolioRecord(*(self._columns[field][index] for field in FIELDS))
+
+    def __iter__(self) -> Iterator[PortfolioRecord]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers and offsets."""
+        return sum(
+            len(column.data) + len(column.offsets) * column.offsets.itemsize
+            for column in self._columns.values()
+        )
+
+    def append(self, record: PortfolioRecord) -> None:
+        for field in FIELDS:
+            self._columns[field].append(getattr(record, field))
+
+    # --- Ingestion ---
+    @classmethod
+    def from_records(cls, records: Iterable[PortfolioRecord]) -> "PortfolioStore":
+        store = cls()
+        for record in records:
+            store.append(record)
+        return store
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], source: str = "portfolio") -> "PortfolioStore":
+        """Validate and ingest mapping rows one at a time; rows missing required values are skipped."""
+        store = cls()
+        skipped = 0
+        for line, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                raise PortfolioSchemaError(f"{source} row {line} is a {type(row).__name__}, expected an object with {', '.join(REQUIRED_COLUMNS)}")
+            values = {attr: str(row.get(column) or '').strip() for column, attr in PORTFOLIO_COLUMNS.items()}
+            if not all(values[PORTFOLIO_COLUMNS[column]] for column in REQUIRED_COLUMNS):
+                skipped += 1
+                logger.debug(f"Skipping {source} row {line}: missing {', '.join(REQUIRED_COLUMNS)}")
+                continue
+            store.append(PortfolioRecord(**values))
+        if skipped:
+            logger.warning(f"Skipped {skipped} invalid rows in {source}")
+        return store
+
+    @classmethod
+    def from_csv(cls, path: str) -> "PortfolioStore":
+        """Stream a CSV portfolio file, validating its header against the schema."""
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None:
+                raise PortfolioSchemaError(f"Portfolio file {path} is empty")
+            _validate_columns(reader.fieldnames, path)
+            return cls.from_rows(reader, source=path)
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "PortfolioStore":
+        """Stream a JSON Lines portfolio file with one object per line."""
+        def rows():
+            with open(path, encoding='utf-8') as f:
+                for number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise PortfolioSchemaError(f"Invalid JSON on line {number} of {path}: {e}") from e
+
+        store = cls.from_rows(rows(), source=path)
+        if not len(store):
+            raise PortfolioSchemaError(f"No valid portfolio entries in {path}; required columns: {', '.join(REQUIRED_COLUMNS)}")
+        return store
+
+    @classmethod
+    def from_file(cls, path: str) -> "PortfolioStore":
+        if path.endswith(('.jsonl', '.ndjson')):
+            return cls.from_jsonl(path)
+        return cls.from_csv(path)
+
+    # --- Binary snapshot ---
+    def save_snapshot(self, path: str) -> None:
+        """Write the columns to a binary snapshot (header, then offsets and data per field)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, sys.byteorder == 'little', len(self), len(FIELDS)))
+            for field in FIELDS:
+                column = self._columns[field]
+                f.write(struct.pack("<Q", len(column.data)))
+                f.write(column.offsets.tobytes())
+                f.write(column.data)
+                # Keep the next offsets array 4-byte aligned for memoryview casting
+                f.write(b"\0" * (-len(column.data) % 4))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "PortfolioStore":
+        """Memory-map a snapshot; strings are decoded lazily straight from the mapped pages."""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise PortfolioSchemaError(f"Truncated portfolio snapshot {path}")
+            backing = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(backing)
+        magic, little_endian, count, field_count = _HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or field_count != len(FIELDS) or bool(little_endian) != (sys.byteorder == 'little'):
+            raise PortfolioSchemaError(f"Incompatible portfolio snapshot {path}")
+
+        columns = {}
+        position = _HEADER.size
+        offsets_size = (count + 1) * 4
+        for field in FIELDS:
+            # Every size comes from the file, so check it against the mapping before slicing
+            if position + 8 + offsets_size > len(backing):
+                raise PortfolioSchemaError(f"Truncated portfolio snapshot {path}")
+            (data_size,) = struct.unpack_from("<Q", view, position)
+            position += 8
+            offsets = view[position:position + offsets_size].cast('I')
+            position += offsets_size
+            if position + data_size > len(backing) or offsets[0] != 0 or offsets[count] != data_size:
+                raise PortfolioSchemaError(f"Corrupt or truncated portfolio snapshot {path}")
+            columns[field] = _StringColumn(offsets, view[position:position + data_size])
+            position += data_size + (-data_size % 4)
+        if position != len(backing):
+            raise PortfolioSchemaError(f"Portfolio snapshot {path} has {len(backing) - position} unexpected trailing bytes")
+        return cls(columns, backing)
+
+    @classmethod
+    def load(cls, path: str, snapshot_path: Optional[str] = None) -> "PortfolioStore":
+        """Load from a fresh snapshot if one exists, otherwise parse the source and write one."""
+        snapshot_path = snapshot_path or f"{path}.snapshot"
+        if os.path.exists(snapshot_path) and os.path.getmtime(snapshot_path) >= os.path.getmtime(path):
+            try:
+                store = cls.load_snapshot(snapshot_path)
+                logger.info(f"Portfolio snapshot loaded from {snapshot_path}")
+                return store
+            except (PortfolioSchemaError, ValueError, TypeError, OSError, struct.error) as e:
+                logger.warning(f"Ignoring unreadable portfolio snapshot {snapshot_path}: {e}")
+
+        store = cls.from_file(path)
+        try:
+            store.save_snapshot(snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write portfolio snapshot {snapshot_path}: {e}")
+        return store
+
+def _validate_columns(fieldnames: List[str], source: str) -> None:
+    missing = [column for column in REQUIRED_COLUMNS if column not in fieldnames]
+    if missing:
+        raise PortfolioSchemaError(f"Portfolio file {source} is missing required columns: {', '.join(missing)}")
+    unknown = [name for name in fieldnames if name not in PORTFOLIO_COLUMNS]
+    if unknown:
+        logger.info(f"Ignoring unknown portfolio columns in {source}: {', '.join(unknown)}")
@@ -0,0 +1,138 @@
+import json
+import re
+import textwrap
+from typing import Dict, Any, Tuple
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count: one per word piece of up to four characters, one per symbol."""
+    return sum((len(piece) + 3) // 4 if piece[0].isalnum() else 1 for piece in _TOKEN_PATTERN.findall(text))
+
+def compact_json(value: Any) -> str:
+    """Serialize variable data without indentation whitespace."""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def _static(text: str) -> str:
+    """Dedent and strip a literal so the same bytes are produced on every call."""
+    return textwrap.dedent(text).strip()
+
+class PromptTemplate:
+    """A versioned prompt with a static prefix and variable fields appended at the end.
+
+    The prefix is compiled once, so every call starts with byte-identical text
+    that providers can serve from their prefix cache. Variable data is
+    rendered last, one labelled section per field, with dicts and lists as
+    compact JSON.
+    """
+    __slots__ = ('name', 'version', 'prefix', 'fields', '_labels', 'prefix_tokens')
+
+    def __init__(self, name: str, version: int, prefix: str, fields: Tuple[Tuple[str, str], ...]):
+        self.name = name
+        self.version = version
+        self.prefix = _static(prefix)
+        self.fields = tuple(field for field, _ in fields)
+        self._labels = tuple(f"\n\n{label}:\n" for _, label in fields)
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **values: Any) -> str:
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise KeyError(f"Prompt {self.key} missing fields: {', '.join(missing)}")
+        parts = [self.prefix]
+        for field, label in zip(self.fields, self._labels):
+            value = values[field]
+            parts.append(label)
+            parts.append(value if isinstance(value, str) else compact_json(value))
+        return ''.join(parts)
+
+# --- Agent backstories (static system prefix of every crew call) ---
+JOB_ANALYST_BACKSTORY = _static("""
+    You are an expert job analyst with years of experience in talent acquisition and recruitment.
+    You excel at parsing through job descriptions, identifying key requirements, and understanding
+    what companies are truly looking for in candidates.
+""")
+
+PORTFOLIO_ANALYST_BACKSTORY = _static("""
+    You are a senior portfolio analyst who evaluates technical skills, project portfolios and team
+    capabilities, and matches them with job requirements, including which team members combine
+    well on a project.
+""")
+
+EMAIL_WRITER_BACKSTORY = _static("""
+    You are SURESH BEEKHANI, a business development executive at Nexgenai with a track record of
+    cold emails that get replies. You highlight team capabilities, relevant portfolio work and
+    clear value propositions.
+""")
+
+TEAM_COORDINATOR_BACKSTORY = _static("""
+    You are a senior project coordinator who reviews the work of specialists for quality and
+    consistency and makes sure the final deliverable meets the highest standards.
+""")
+
+# --- Task templates ---
+JOB_EXTRACTION = PromptTemplate(
+    name="job_extraction",
+    version=2,
+    prefix="""
+        Extract every job posting from the careers page text below.
+        For each job capture the role title, required experience level, required skills
+        (technical and soft) and a short description.
+        Return only a valid JSON array, with no other text, in this structure:
+        [{"role":"Job Title","experience":"Experience Level","skills":["skill1","skill2"],"description":"Job description"}]
+    """,
+    fields=(("text", "TEXT"),)
+)
+
+PORTFOLIO_MATCH = PromptTemplate(
+    name="portfolio_match",
+    version=2,
+    prefix="""
+        Analyze the job requirements and portfolio data below to create the best team match:
+        1. Identify the key skills the job needs
+        2. Identify relevant portfolio projects and experience
+        3. Decide whether this is a single-agent or team opportunity, and if a team, which skill sets complement each other
+        4. Report the skill match percentage, relevant projects, team composition and value proposition highlights
+        Return a structured analysis that can be used for email generation.
+    """,
+    fields=(("job", "JOB"), ("portfolio", "PORTFOLIO"))
+)
+
+COLD_EMAIL = PromptTemplate(
+    name="cold_email",
+    version=2,
+    prefix="""
+        Write a professional cold email as SURESH BEEKHANI, BDE at Nexgenai, that:
+        1. Introduces Nexgenai as an AI & Software Consulting company
+        2. Addresses the specific job requirements
+        3. Highlights relevant portfolio work and team capabilities
+        4. Demonstrates a clear value proposition for the client
+        5. Ends with a compelling call-to-action
+        Keep a professional but engaging tone, in business format with a proper greeting and closing.
+    """,
+    fields=(("job", "JOB"), ("portfolio", "PORTFOLIO"))
+)
+
+TEMPLATES = (JOB_EXTRACTION, PORTFOLIO_MATCH, COLD_EMAIL)
+
+BACKSTORIES = {
+    "job_analyst": JOB_ANALYST_BACKSTORY,
+    "portfolio_analyst": PORTFOLIO_ANALYST_BACKSTORY,
+    "email_writer": EMAIL_WRITER_BACKSTORY,
+    "team_coordinator": TEAM_COORDINATOR_BACKSTORY,
+}
+
+def template_token_report() -> Dict[str, int]:
+    """Estimated static token count of every template and backstory."""
+    report = {template.key: template.prefix_tokens for template in TEMPLATES}
+    report.update({f"backstory:{name}": estimate_tokens(text) for name, text in BACKSTORIES.items()})
+    return report
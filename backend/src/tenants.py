@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional
+import logging
+
+import chromadb
+from chromadb.config import Settings
+
+from src.portfolio import Portfolio
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+PORTFOLIO_EXTENSIONS = ('.csv', '.jsonl', '.ndjson')
+
+# Persist usage counts after this many lookups so warm-up survives restarts
+_USAGE_FLUSH_INTERVAL = 50
+
+class UnknownTenantError(KeyError):
+    """Raised when a tenant has no portfolio file."""
+
+class TenantPortfolios:
+    """Lazily loaded, per-tenant Portfolio instances kept in a memory-bounded LRU.
+
+    Each tenant's portfolio lives in ``<tenants_dir>/<tenant>.csv`` (or
+    ``.jsonl``) and is embedded into its own Chroma collection. The default
+    tenant keeps the original ``resource/my_portfolio.csv`` and ``portfolio``
+    collection. Loaded tenants are evicted least-recently-used first once
+    their estimated memory exceeds ``max_memory_bytes``; Chroma is configured
+    with the same budget so evicted collections' indexes are released too.
+    """
+
+    def __init__(self, tenants_dir: str = "resource/tenants", default_file: str = "resource/my_portfolio.csv",
+                 max_memory_bytes: int = 512 * 1024 * 1024, max_tenants: int = 32,
+                 chroma_path: str = "src/vectorstore"):
+        self.tenants_dir = tenants_dir
+        self.default_file = default_file
+        self.max_memory_bytes = max_memory_bytes
+        self.max_tenants = max_tenants
+        self.chroma_client = chromadb.PersistentClient(chroma_path, settings=Settings(
+            chroma_segment_cache_policy="LRU",
+            chroma_memory_limit_bytes=max_memory_bytes
+        ))
+
+        self._loaded: "OrderedDict[str, Portfolio]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._flush_lock = threading.Lock()
+        self._usage_path = os.path.join(tenants_dir, ".usage.json")
+        self._usage = self._read_usage()
+        self._lookups = 0
+
+    def portfolio_file(self, tenant: str) -> str:
+        if tenant == DEFAULT_TENANT:
+            return self.default_file
+        for extension in PORTFOLIO_EXTENSIONS:
+            path = os.path.join(self.tenants_dir, f"{tenant}{extension}")
+            if os.path.exists(path):
+                return path
+        raise UnknownTenantError(tenant)
+
+    @staticmethod
+    def collection_name(tenant: str) -> str:
+        return "portfolio" if tenant == DEFAULT_TENANT else f"portfolio_{tenant}"
+
+    def get(self, tenant: Optional[str] = None, count_usage: bool = True) -> Portfolio:
+        """Return the tenant's portfolio, loading it (and evicting others) if needed."""
+        tenant = tenant or DEFAULT_TENANT
+        if not _TENANT_ID.match(tenant):
+            raise ValueError(f"Invalid tenant id: {tenant!r}")
+
+        with self._lock:
+            portfolio = self._loaded.get(tenant)
+            if portfolio is not None:
+                self._loaded.move_to_end(tenant)
+                flush = count_usage and self._count_usage(tenant)
+        if portfolio is not None:
+            if flush:
+                self.flush_usage()
+            return portfolio
+
+        # Unknown tenants fail here, before anything is recorded for them
+        path = self.portfolio_file(tenant)
+        with self._lock:
+            flush = count_usage and self._count_usage(tenant)
+            loading_lock = self._loading.setdefault(tenant, threading.Lock())
+        if flush:
+            self.flush_usage()
+
+        # Load outside the registry lock so other tenants aren't blocked; the per-tenant
+        # lock makes concurrent first requests for the same tenant share one load
+        try:
+            with loading_lock:
+                with self._lock:
+                    portfolio = self._loaded.get(tenant)
+                    if portfolio is not None:
+                        self._loaded.move_to_end(tenant)
+                        return portfolio
+
+                portfolio = Portfolio(path, self.collection_name(tenant), self.chroma_client)
+                portfolio.load_portfolio()
+                size = portfolio.memory_usage()
+                logger.info(f"Loaded portfolio for tenant {tenant} ({len(portfolio.data)} entries, ~{size // 1024} KiB)")
+
+                with self._lock:
+                    self._loaded[tenant] = portfolio
+                    self._sizes[tenant] = size
+                    self._evict()
+                return portfolio
+        finally:
+            # Drop the loading lock on success and failure alike, unless a later load replaced it
+            with self._lock:
+                if self._loading.get(tenant) is loading_lock:
+                    del self._loading[tenant]
+
+    def _evict(self) -> None:
+        """Drop least-recently-used tenants until within budget, always keeping the newest."""
+        while len(self._loaded) > 1 and (
+            len(self._loaded) > self.max_tenants or sum(self._sizes.values()) > self.max_memory_bytes
+        ):
+            tenant, _ = self._loaded.popitem(last=False)
+            self._sizes.pop(tenant, None)
+            logger.info(f"Evicted portfolio for tenant {tenant}")
+
+    def warm_up(self, count: int) -> List[str]:
+        """Load the most-used tenants from previous runs, stopping once the memory budget is full."""
+        warmed = []
+        # With no history yet, preload the default tenant as before multi-tenancy
+        candidates = [tenant for tenant, _ in self._usage.most_common(count)] or [DEFAULT_TENANT]
+        for tenant in candidates:
+            try:
+                self.get(tenant, count_usage=False)
+            except (UnknownTenantError, ValueError) as e:
+                logger.warning(f"Skipping warm-up of tenant {tenant}: {e}")
+                continue
+            warmed.append(tenant)
+            with self._lock:
+                if sum(self._sizes.values()) >= self.max_memory_bytes:
+                    break
+        logger.info(f"Warmed up tenants: {warmed}")
+        return warmed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": list(self._loaded),
+                "memory_bytes": sum(self._sizes.values()),
+                "max_memory_bytes": self.max_memory_bytes,
+                "usage": dict(self._usage.most_common(20)),
+            }
+
+    def _count_usage(self, tenant: str) -> bool:
+        """Count a lookup (caller holds the lock); returns True when the counts are due to be flushed."""
+        self._usage[tenant] += 1
+        self._lookups += 1
+        return self._lookups % _USAGE_FLUSH_INTERVAL == 0
+
+    def _read_usage(self) -> Counter:
+        try:
+            with open(self._usage_path, encoding='utf-8') as f:
+                return Counter(json.load(f))
+        except (OSError, ValueError):
+            return Counter()
+
+    def flush_usage(self) -> None:
+        """Persist tenant usage counts used to pick warm-up candidates."""
+        with self._lock:
+            usage = dict(self._usage)
+        # File I/O stays off the registry lock; the flush lock only orders concurrent writers
+        try:
+            with self._flush_lock:
+                os.makedirs(self.tenants_dir, exist_ok=True)
+                tmp_path = f"{self._usage_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(usage, f)
+                os.replace(tmp_path, self._usage_path)
+        except OSError as e:
+            logger.warning(f"Could not save tenant usage counts: {e}")
@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("crewai")
+pytest.importorskip("langchain_groq")
+
+from src.agents import MAX_CREW_THREADS, ColdEmailAgents
+from src.deadline import Deadline, DeadlineExceeded, LatencyTracker
+
+
+def make_agents(crew_behaviour):
+    agents = ColdEmailAgents.__new__(ColdEmailAgents)
+    agents.llm = "llama3-8b-8192"
+    agents.crew_latency = LatencyTracker()
+    agents._crew_slots = threading.BoundedSemaphore(MAX_CREW_THREADS)
+    agents._crew_context = threading.local()
+    if crew_behaviour is not None:
+        agents.process_complete_workflow = crew_behaviour
+    return agents
+
+
+class SteppingCrew:
+    """Stands in for a Crew: runs agent steps until released, calling the agents' step callback after each."""
+
+    def __init__(self, agents, steps=1000):
+        self.agents = agents
+        self.steps = steps
+        self.steps_taken = 0
+        self.finished = threading.Event()
+        self.release = threading.Event()
+
+    def kickoff(self):
+        try:
+            for _ in range(self.steps):
+                if self.release.wait(0.01):
+                    return "crew output"
+                self.steps_taken += 1
+                self.agents._check_crew_deadline(None)
+            return "crew output"
+        finally:
+            self.finished.set()
+
+
+def failing_crew(cleaned_text, portfolio_links, deadline):
+    raise RuntimeError("crew exploded")
+
+
+@pytest.mark.parametrize("attempt", range(20))
+def test_immediate_crew_result_is_returned(attempt):
+    agents = make_agents(lambda cleaned_text, portfolio_links, deadline: "crew email")
+    assert agents.run_workflow("careers page", [], Deadline(10), fallback=lambda d: ["fallback"]) == "crew email"
+
+
+@pytest.mark.parametrize("attempt", range(20))
+def test_immediate_crew_failure_switches_to_fallback(attempt):
+    agents = make_agents(failing_crew)
+    assert agents.run_workflow("careers page", [], Deadline(10), fallback=lambda d: ["fallback"]) == ["fallback"]
+
+
+def test_fallback_receives_child_deadline():
+    agents = make_agents(failing_crew)
+    parent = Deadline(10)
+    seen = []
+    result = agents.run_workflow("careers page", [], parent, fallback=lambda d: seen.append(d) or ["ok"])
+
+    assert result == ["ok"]
+    assert seen[0].parent is parent
+
+
+def test_all_attempts_failing_raises():
+    def failing_fallback(deadline):
+        raise ValueError("fallback exploded")
+
+    agents = make_agents(failing_crew)
+    with pytest.raises(RuntimeError, match="fallback exploded"):
+        agents.run_workflow("careers page", [], Deadline(10), fallback=failing_fallback)
+
+
+def test_slow_crew_is_hedged_and_cancelled(monkeypatch):
+    monkeypatch.setattr("src.agents.HEDGE_PERCENTILE", 50)
+    crew_deadlines = []
+
+    def slow_crew(cleaned_text, portfolio_links, deadline):
+        crew_deadlines.append(deadline)
+        while not deadline.expired:
+            time.sleep(0.01)
+        deadline.check("Workflow")
+
+    agents = make_agents(slow_crew)
+    for _ in range(5):
+        agents.crew_latency.record(0.05)
+
+    assert agents.run_workflow("careers page", [], Deadline(10), fallback=lambda d: ["hedged"]) == ["hedged"]
+    assert crew_deadlines[0].cancelled
+
+
+def test_crew_without_hedging_is_awaited():
+    def slowish_crew(cleaned_text, portfolio_links, deadline):
+        time.sleep(0.2)
+        return "crew email"
+
+    agents = make_agents(slowish_crew)
+    assert agents.run_workflow("careers page", [], Deadline(10), fallback=lambda d: ["fallback"]) == "crew email"
+
+
+def test_kickoff_returns_crew_output():
+    agents = make_agents(None)
+    crew = SteppingCrew(agents)
+    crew.release.set()
+    assert agents._kickoff(crew, Deadline(5), "Email generation") == "crew output"
+
+
+def test_abandoned_crew_stops_at_next_step_and_frees_its_slot():
+    agents = make_agents(None)
+    crew = SteppingCrew(agents)
+    deadline = Deadline(0.2)
+
+    with pytest.raises(DeadlineExceeded):
+        agents._kickoff(crew, deadline, "Email generation")
+    # The crew thread notices the expired deadline at its next step instead of running on
+    assert crew.finished.wait(1)
+    assert crew.steps_taken < 100
+    assert agents._crew_slots.acquire(blocking=False)
+
+
+def test_cancelled_request_stops_crew():
+    agents = make_agents(None)
+    crew = SteppingCrew(agents)
+    deadline = Deadline(10)
+    threading.Timer(0.1, deadline.cancel, args=("client disconnected",)).start()
+
+    with pytest.raises(DeadlineExceeded, match="client disconnected"):
+        agents._kickoff(crew, deadline, "Workflow")
+    assert crew.finished.wait(1)
+
+
+def test_crew_threads_are_capped():
+    agents = make_agents(None)
+    crews = [SteppingCrew(agents) for _ in range(MAX_CREW_THREADS)]
+    deadline = Deadline(10)
+    runners = [threading.Thread(target=agents._kickoff, args=(crew, deadline, "Workflow")) for crew in crews]
+    for runner in runners:
+        runner.start()
+    while not all(crew.steps_taken for crew in crews):
+        time.sleep(0.01)
+
+    with pytest.raises(RuntimeError, match="crew runs already in flight"):
+        agents._kickoff(SteppingCrew(agents), deadline, "Workflow")
+
+    for crew in crews:
+        crew.release.set()
+    for runner in runners:
+        runner.join(1)
+    extra = SteppingCrew(agents)
+    extra.release.set()
+    assert agents._kickoff(extra, deadline, "Workflow") == "crew output"
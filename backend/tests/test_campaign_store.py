@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import sqlite3
+
+import pytest
+
+from src.campaign_store import EXPORT_COLUMNS, CampaignStore, job_hash
+
+
+def make_email(i, role="Backend Engineer"):
+    return {
+        "job_title": role,
+        "job_description": f"Job number {i}",
+        "required_skills": ["Python", f"skill-{i}"],
+        "experience_level": "3 years",
+        "email_content": f"Hello #{i}",
+        "portfolio_matches": [{"link": f"https://example.com/{i}"}],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CampaignStore(str(tmp_path / "campaigns.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_keyset_pagination_walks_every_row_once_newest_first(store):
+    store.record_emails([make_email(i) for i in range(7)], "https://example.com/careers")
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.query(limit=3, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    ids = [email["id"] for email in seen]
+    assert len(ids) == 7
+    assert ids == sorted(ids, reverse=True)
+    assert seen[0]["email_content"] == "Hello #6"
+    assert seen[0]["required_skills"] == ["Python", "skill-6"]
+
+
+def test_last_full_page_has_no_cursor(store):
+    store.record_emails([make_email(i) for i in range(3)])
+    page, cursor = store.query(limit=3)
+    assert len(page) == 3
+    assert cursor is None
+
+
+def test_filters(store):
+    store.record_emails([make_email(1), make_email(2, role="Data Engineer")], "https://a.example.com", tenant="acme")
+    store.record_emails([make_email(3)], "https://b.example.com")
+
+    assert [e["email_content"] for e in store.query(tenant="acme")[0]] == ["Hello #2", "Hello #1"]
+    assert [e["email_content"] for e in store.query(role="Data Engineer")[0]] == ["Hello #2"]
+    assert [e["email_content"] for e in store.query(source_url="https://b.example.com")[0]] == ["Hello #3"]
+    assert [e["email_content"] for e in store.query(job_hash=job_hash(make_email(1)))[0]] == ["Hello #1"]
+    assert store.query(tenant="acme", role="Backend Engineer", limit=10)[0][0]["tenant"] == "acme"
+    assert store.query(since=9e12)[0] == []
+
+
+def test_exports_stream_one_row_per_chunk(store):
+    store.record_emails([make_email(i) for i in range(5)], tenant="acme")
+
+    chunks = store.export_jsonl(tenant="acme")
+    first = json.loads(next(chunks))
+    assert first["email_content"] == "Hello #4"
+    assert len(list(chunks)) == 4
+
+    rows = list(csv.reader(io.StringIO(''.join(store.export_csv(tenant="acme")))))
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert len(rows) == 6
+    assert json.loads(rows[1][EXPORT_COLUMNS.index("required_skills")]) == ["Python", "skill-4"]
+
+
+def test_iter_rows_crosses_batch_boundaries(store):
+    store.record_emails([make_email(i) for i in range(10)])
+    assert len(list(store.iter_rows(batch_size=3))) == 10
+
+
+def test_tenant_column_is_added_to_existing_store(tmp_path):
+    db_path = str(tmp_path / "campaigns.sqlite3")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE emails (
+        id INTEGER PRIMARY KEY, job_hash TEXT NOT NULL, role TEXT NOT NULL, source_url TEXT,
+        experience_level TEXT, required_skills TEXT, job_description TEXT, email_content TEXT,
+        portfolio_matches TEXT, location TEXT, work_type TEXT, created_at REAL NOT NULL
+    )""")
+    conn.execute("INSERT INTO emails (job_hash, role, email_content, created_at) VALUES ('h', 'Old Role', 'old', 1.0)")
+    conn.commit()
+    conn.close()
+
+    store = CampaignStore(db_path)
+    store.record_emails([make_email(1)], tenant="acme")
+    assert [e["role"] for e in store.query(tenant="default")[0]] == ["Old Role"]
+    assert [e["email_content"] for e in store.query(tenant="acme")[0]] == ["Hello #1"]
+    store.close()
@@ -0,0 +1,112 @@
+import os
+import threading
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from src.crawler import CareersCrawler
+from src.deadline import Deadline
+
+FIXTURE_SITE = os.path.join(os.path.dirname(__file__), "fixtures", "careers_site")
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture site and records every requested path."""
+
+    requests = Counter()
+
+    def do_GET(self):
+        RecordingHandler.requests[self.path] += 1
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    RecordingHandler.requests = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RecordingHandler, directory=FIXTURE_SITE))
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/", RecordingHandler.requests
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(start_url, **kwargs):
+    crawler = CareersCrawler(politeness_delay=0, timeout=5, **kwargs)
+    return {page.url.rsplit("/", 1)[-1]: page for page in crawler.crawl(start_url, Deadline(30))}
+
+
+def test_follows_pagination_to_every_listing(site):
+    start_url, requests = site
+    pages = crawl(start_url)
+
+    assert sorted(pages) == ["backend-engineer.html", "data-engineer.html", "ml-engineer.html"]
+    assert "Spark, Airflow and dbt" in pages["data-engineer.html"].text
+    assert pages["ml-engineer.html"].depth == 3
+    assert requests["/page/2/"] == 1
+    assert requests["/page/3/"] == 1
+
+
+def test_robots_exclusions_are_respected(site):
+    start_url, requests = site
+    pages = crawl(start_url)
+
+    assert "secret-role.html" not in pages
+    assert requests["/jobs/secret-role.html"] == 0
+    assert requests["/robots.txt"] == 1
+
+
+def test_same_url_with_fragment_is_fetched_once(site):
+    start_url, requests = site
+    crawl(start_url)
+
+    # Linked from page 1 twice (once with #apply) and again from page 2
+    assert requests["/jobs/backend-engineer.html"] == 1
+    assert requests["/page/2/"] == 1
+
+
+def test_depth_cap_stops_pagination(site):
+    start_url, requests = site
+    pages = crawl(start_url, max_depth=1)
+
+    assert sorted(pages) == ["backend-engineer.html", "data-engineer.html"]
+    assert requests["/page/3/"] == 0
+
+
+def test_page_cap_counts_only_successful_fetches(site):
+    start_url, requests = site
+    # The 404 and the robots-disallowed link must not use up the budget
+    pages = crawl(start_url, max_pages=3, max_workers=1)
+
+    assert requests["/jobs/missing.html"] == 1
+    assert requests["/jobs/secret-role.html"] == 0
+    successful = sum(count for path, count in requests.items() if path not in ("/robots.txt", "/jobs/missing.html"))
+    # The first listing, the backend job and the second listing
+    assert successful == 3
+    assert list(pages) == ["backend-engineer.html"]
+    assert requests["/jobs/data-engineer.html"] == 0
+
+
+def test_ignores_robots_when_disabled(site):
+    start_url, requests = site
+    pages = crawl(start_url, respect_robots=False)
+
+    assert "secret-role.html" in pages
+    assert requests["/robots.txt"] == 0
+
+
+def test_expired_deadline_fetches_nothing(site):
+    start_url, requests = site
+    crawler = CareersCrawler(politeness_delay=0, timeout=5)
+    deadline = Deadline(30)
+    deadline.cancel("test")
+
+    assert list(crawler.crawl(start_url, deadline)) == []
+    assert sum(requests.values()) == 0
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from src.deadline import Deadline, DeadlineExceeded, LatencyTracker, run_in_thread
+
+
+def test_remaining_counts_down_and_expires():
+    deadline = Deadline(0.05)
+    assert 0 < deadline.remaining() <= 0.05
+    assert not deadline.expired
+    time.sleep(0.06)
+    assert deadline.expired
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded, match="Scraping aborted: time budget exhausted"):
+        deadline.check("Scraping")
+
+
+def test_child_never_outlives_parent():
+    parent = Deadline(0.05)
+    child = parent.child(10)
+    assert child.remaining() <= parent.remaining() + 1e-6
+    time.sleep(0.06)
+    assert child.expired
+
+
+def test_child_can_have_a_shorter_budget():
+    parent = Deadline(10)
+    child = parent.child(0.01)
+    time.sleep(0.02)
+    assert child.expired
+    assert not parent.expired
+
+
+def test_cancelling_parent_cancels_children_with_its_reason():
+    parent = Deadline(10)
+    child = parent.child()
+    grandchild = child.child()
+    parent.cancel("client disconnected")
+
+    assert child.cancelled and grandchild.cancelled
+    assert grandchild.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded, match="Workflow aborted: client disconnected"):
+        child.check("Workflow")
+
+
+def test_cancelling_child_leaves_parent_running():
+    parent = Deadline(10)
+    child = parent.child()
+    child.cancel("superseded")
+
+    assert child.cancelled
+    assert not parent.cancelled
+    parent.check("Request")
+    with pytest.raises(DeadlineExceeded, match="superseded"):
+        child.check()
+
+
+def test_first_cancel_reason_wins():
+    deadline = Deadline(10)
+    deadline.cancel("client disconnected")
+    deadline.cancel("time budget exhausted")
+    assert deadline.reason == "client disconnected"
+
+
+def test_latency_percentile_needs_minimum_samples():
+    tracker = LatencyTracker(window=10, min_samples=3)
+    tracker.record(1.0)
+    tracker.record(2.0)
+    assert tracker.percentile(90) is None
+    tracker.record(3.0)
+    assert tracker.percentile(0) == 1.0
+    assert tracker.percentile(50) == 2.0
+    assert tracker.percentile(100) == 3.0
+
+
+def test_latency_window_drops_old_samples():
+    tracker = LatencyTracker(window=3, min_samples=1)
+    for seconds in (10.0, 1.0, 1.0, 1.0):
+        tracker.record(seconds)
+    assert tracker.percentile(100) == 1.0
+
+
+def test_run_in_thread_returns_result_or_exception():
+    assert run_in_thread(lambda x: x * 2, 21).result(1) == 42
+
+    def boom():
+        raise ValueError("boom")
+    assert isinstance(run_in_thread(boom).exception(1), ValueError)
+
+
+def test_run_in_thread_uses_a_daemon_thread():
+    seen = []
+    run_in_thread(lambda: seen.append(threading.current_thread()), name="crew-test").result(1)
+    assert seen[0].daemon
+    assert seen[0].name == "crew-test"
@@ -0,0 +1,81 @@
+from src.dedup import (
+    BatchDeduplicator, NearDuplicateIndex, job_group, job_text, minhash_signature,
+    normalize_for_dedup, shingles, signature_similarity
+)
+
+POSTING = """Senior Backend Engineer
+Posted 2024-05-01
+Requirements:
+- 5+ years of Python experience building APIs
+- Experience with PostgreSQL and Redis at scale
+- Familiarity with Kubernetes and Docker deployments
+- Strong communication skills and ownership mindset
+Apply at https://jobs.example.com/123?utm_source=newsletter"""
+
+DESCRIPTION = ("Build and maintain backend services in Python. Work with PostgreSQL, Redis and Kubernetes. "
+               "Mentor engineers on the team.")
+
+
+def similarity(a, b):
+    return signature_similarity(minhash_signature(a), minhash_signature(b))
+
+
+def test_reposted_page_with_reordered_bullets_matches():
+    lines = POSTING.split('\n')
+    repost = '\n'.join([
+        lines[0], "Posted June 12, 2024", lines[2], lines[5], lines[3], lines[6], lines[4],
+        "Apply at https://jobs.example.com/123?utm_source=twitter"
+    ])
+    assert shingles(repost) == shingles(POSTING)
+    assert similarity(POSTING, repost) == 1.0
+
+
+def test_inline_bullets_are_segmented():
+    text = "Requirements • Python and Django experience required • Strong SQL skills with PostgreSQL"
+    reordered = "Requirements • Strong SQL skills with PostgreSQL • Python and Django experience required"
+    assert shingles(text) == shingles(reordered)
+
+
+def test_experience_numbers_are_kept():
+    assert normalize_for_dedup("5+ years") != normalize_for_dedup("10+ years")
+    assert similarity(POSTING, POSTING.replace("5+", "10+")) < 1.0
+
+
+def test_dates_and_ids_are_ignored():
+    assert normalize_for_dedup("Posted 2024-05-01, ref 12345678") == normalize_for_dedup("Posted 2024-06-30, ref 87654321")
+
+
+def test_different_seniority_is_not_a_duplicate():
+    junior = {"role": "Python Developer", "skills": ["Python", "Django"], "experience": "3 years", "description": DESCRIPTION}
+    senior = {**junior, "role": "Senior Python Developer"}
+    more_experience = {**junior, "experience": "5+ years"}
+    assert job_group(junior) != job_group(senior)
+    assert job_group(junior) != job_group(more_experience)
+
+    deduplicator = BatchDeduplicator(0.85)
+    assert deduplicator.match_or_add(job_text(junior), job_group(junior)) == (0, None)
+    assert deduplicator.match_or_add(job_text(senior), job_group(senior)) == (1, None)
+    assert deduplicator.match_or_add(job_text(more_experience), job_group(more_experience)) == (2, None)
+
+
+def test_batch_duplicates_map_to_first_occurrence():
+    job = {"role": "Data Engineer", "skills": ["Spark", "Airflow"], "experience": "4 years", "description": DESCRIPTION}
+    reposted = {**job, "skills": ["Airflow", "Spark"]}
+    deduplicator = BatchDeduplicator(0.85)
+    assert deduplicator.match_or_add(job_text(job), job_group(job)) == (0, None)
+    assert deduplicator.match_or_add(job_text(reposted), job_group(reposted)) == (1, 0)
+
+
+def test_index_persists_and_respects_kind(tmp_path):
+    db_path = str(tmp_path / "dedup.sqlite3")
+    index = NearDuplicateIndex(db_path, threshold=0.85)
+    index.add(POSTING, "page:default", {"emails": ["hello"]})
+    index.close()
+
+    index = NearDuplicateIndex(db_path, threshold=0.85)
+    similarity_found, payload = index.find(POSTING.replace("2024-05-01", "2024-05-09"), "page:default")
+    assert similarity_found == 1.0
+    assert payload == {"emails": ["hello"]}
+    assert index.find(POSTING, "page:other-tenant") is None
+    assert index.find("An unrelated posting for a chef in a busy restaurant kitchen", "page:default") is None
+    index.close()
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("crewai")
+pytest.importorskip("langchain_community")
+
+from routes.email_generator import _cancel_on_disconnect, _generate_emails_pipelined
+from src.agents import ColdEmailAgents
+from src.deadline import Deadline, LatencyTracker
+
+JOBS_JSON = ('[{"role": "Backend Engineer", "skills": ["Python"], "experience": "3 years"}, '
+             '{"role": "Data Engineer", "skills": ["Spark"], "experience": "5+ years"}]')
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """Streams a two-job array in small chunks and records when each email prompt arrives."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def stream(self, prompt, timeout=None):
+        for i in range(0, len(JOBS_JSON), 7):
+            time.sleep(0.02)
+            with self._lock:
+                self.events.append("chunk")
+            yield FakeMessage(JOBS_JSON[i:i + 7])
+
+    def invoke(self, prompt, timeout=None):
+        with self._lock:
+            self.events.append("email")
+        return FakeMessage("Dear Hiring Manager, ...")
+
+
+class FakePortfolio:
+    def query_links(self, skills):
+        return [{"link": f"https://example.com/{skill.lower()}"} for skill in skills]
+
+
+def make_agents():
+    agents = ColdEmailAgents.__new__(ColdEmailAgents)
+    agents.llm = FakeLLM()
+    agents.crew_latency = LatencyTracker()
+    # Crew email generation fails straight away, so each job uses the direct LLM call
+    agents.email_writer = None
+    return agents
+
+
+def test_streamed_extraction_writes_an_email_per_job_while_streaming():
+    agents = make_agents()
+    deadline = Deadline(10)
+    emails = _generate_emails_pipelined(agents.stream_jobs("careers page", deadline), agents, FakePortfolio(), deadline)
+
+    assert [email["job_title"] for email in emails] == ["Backend Engineer", "Data Engineer"]
+    assert emails[1]["portfolio_matches"] == [{"link": "https://example.com/spark"}]
+    # The first email starts before the stream has finished
+    events = agents.llm.events
+    last_chunk = max(i for i, event in enumerate(events) if event == "chunk")
+    assert events.count("email") == 2
+    assert events.index("email") < last_chunk
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.polls > self.disconnect_after
+
+
+def test_disconnect_cancels_deadline(monkeypatch):
+    monkeypatch.setattr("routes.email_generator.DISCONNECT_POLL_SECONDS", 0.01)
+    deadline = Deadline(10)
+    request = FakeRequest(disconnect_after=3)
+
+    asyncio.run(_cancel_on_disconnect(request, deadline))
+
+    assert deadline.cancelled
+    assert deadline.reason == "client disconnected"
+    assert request.polls == 4
+
+
+def test_watcher_stops_when_deadline_expires(monkeypatch):
+    monkeypatch.setattr("routes.email_generator.DISCONNECT_POLL_SECONDS", 0.01)
+    deadline = Deadline(0.05)
+    request = FakeRequest(disconnect_after=10**6)
+
+    asyncio.run(asyncio.wait_for(_cancel_on_disconnect(request, deadline), timeout=1))
+
+    assert deadline.expired
+    assert deadline.reason is None
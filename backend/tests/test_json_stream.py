@@ -0,0 +1,50 @@
+from src.json_stream import JsonObjectStreamParser, iter_json_objects, parse_json_objects
+
+
+def test_parses_objects_from_array_with_surrounding_prose():
+    text = 'Here are the jobs:\n[{"role": "A", "skills": ["x", "y"]}, {"role": "B"}]\nDone.'
+    assert parse_json_objects(text) == [{"role": "A", "skills": ["x", "y"]}, {"role": "B"}]
+
+
+def test_yields_each_object_as_soon_as_it_closes():
+    chunks = ['[{"role": "A"', '}, {"ro', 'le": "B"}', ']']
+    parser = JsonObjectStreamParser()
+    assert [parser.feed(chunk) for chunk in chunks] == [[], [{"role": "A"}], [{"role": "B"}], []]
+
+
+def test_brackets_inside_strings_are_ignored():
+    text = '[{"role": "A", "description": "uses {braces} and [brackets] \\" here"}]'
+    assert parse_json_objects(text) == [{"role": "A", "description": 'uses {braces} and [brackets] " here'}]
+
+
+def test_mismatched_bracket_resynchronises_at_next_object():
+    parser = JsonObjectStreamParser()
+    jobs = parser.feed('[{"role":"A","skills":["x"}, {"role":"B"}]')
+    assert jobs == [{"role": "B"}]
+    assert parser.skipped == 1
+
+
+def test_malformed_object_is_skipped():
+    assert parse_json_objects('[{"role": "A",}, {"role": "B"}]') == [{"role": "B"}]
+
+
+def test_wrapper_with_single_array_key_is_unwrapped():
+    text = '{"jobs": [{"role": "A"}, {"role": "B"}]}'
+    assert parse_json_objects(text) == [{"role": "A"}, {"role": "B"}]
+
+
+def test_single_key_object_without_object_array_is_kept():
+    assert parse_json_objects('{"role": "A"}') == [{"role": "A"}]
+    assert parse_json_objects('{"skills": ["x", "y"]}') == [{"skills": ["x", "y"]}]
+
+
+def test_truncated_stream_keeps_completed_objects():
+    parser = JsonObjectStreamParser()
+    jobs = parser.feed('[{"role": "A"}, {"role": "B", "skills": ["x"')
+    parser.close()
+    assert jobs == [{"role": "A"}]
+    assert parser.skipped == 1
+
+
+def test_iter_json_objects_across_chunks():
+    assert list(iter_json_objects(['{"a"', ': 1}{', '"b": 2}'])) == [{"a": 1}, {"b": 2}]
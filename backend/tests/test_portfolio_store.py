@@ -0,0 +1,146 @@
+import json
+import mmap
+import os
+
+import pytest
+
+from src.portfolio_store import PortfolioRecord, PortfolioSchemaError, PortfolioStore
+
+
+def write_csv(path, rows):
+    lines = ["Techstack,Links,Experience,Specialization"] + [",".join(row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_rows_are_ingested_from_a_generator_and_invalid_ones_skipped():
+    consumed = []
+
+    def rows():
+        for i in range(1000):
+            consumed.append(i)
+            yield {"Techstack": f"Python {i}", "Links": "" if i % 100 == 0 else f"https://example.com/{i}"}
+
+    store = PortfolioStore.from_rows(rows())
+    assert len(consumed) == 1000
+    assert len(store) == 990
+    assert store[0].links == "https://example.com/1"
+    assert store[-1].techstack == "Python 999"
+
+
+def test_csv_round_trips_unicode(tmp_path):
+    path = tmp_path / "portfolio.csv"
+    write_csv(path, [("Python; Django", "https://example.com/ü", "5 years", "Backend — APIs")])
+    record = PortfolioStore.from_csv(str(path))[0]
+    assert record.links == "https://example.com/ü"
+    assert record.specialization == "Backend — APIs"
+
+
+def test_snapshot_is_memory_mapped_and_matches_source(tmp_path):
+    store = PortfolioStore.from_records(
+        PortfolioRecord(f"Stack {i}", f"https://example.com/{i}", f"{i} years", "ü" * (i % 3)) for i in range(50)
+    )
+    snapshot = str(tmp_path / "portfolio.snapshot")
+    store.save_snapshot(snapshot)
+
+    loaded = PortfolioStore.load_snapshot(snapshot)
+    assert isinstance(loaded._backing, mmap.mmap)
+    assert len(loaded) == 50
+    assert [r.metadata() for r in loaded] == [r.metadata() for r in store]
+
+
+def test_corrupt_snapshot_is_rejected(tmp_path):
+    snapshot = tmp_path / "portfolio.snapshot"
+    snapshot.write_bytes(b"NOTASNAP" + b"\0" * 64)
+    with pytest.raises(PortfolioSchemaError):
+        PortfolioStore.load_snapshot(str(snapshot))
+
+
+def test_missing_required_column_is_a_schema_error(tmp_path):
+    path = tmp_path / "portfolio.csv"
+    path.write_text("Techstack,Experience\nPython,3 years\n", encoding="utf-8")
+    with pytest.raises(PortfolioSchemaError, match="Links"):
+        PortfolioStore.from_csv(str(path))
+
+
+def test_empty_csv_is_a_schema_error(tmp_path):
+    path = tmp_path / "portfolio.csv"
+    path.write_text("", encoding="utf-8")
+    with pytest.raises(PortfolioSchemaError):
+        PortfolioStore.from_csv(str(path))
+
+
+@pytest.mark.parametrize("line", ['["Python", "https://example.com"]', '"just a string"', '42', '{"Techstack": "Python",'])
+def test_non_object_jsonl_line_is_a_schema_error(tmp_path, line):
+    path = tmp_path / "portfolio.jsonl"
+    path.write_text(json.dumps({"Techstack": "Go", "Links": "https://example.com/go"}) + "\n" + line + "\n", encoding="utf-8")
+    with pytest.raises(PortfolioSchemaError):
+        PortfolioStore.from_jsonl(str(path))
+
+
+def test_jsonl_without_valid_entries_is_a_schema_error(tmp_path):
+    path = tmp_path / "portfolio.jsonl"
+    path.write_text(json.dumps({"Techstack": "Go"}) + "\n", encoding="utf-8")
+    with pytest.raises(PortfolioSchemaError):
+        PortfolioStore.from_jsonl(str(path))
+
+
+def test_load_reuses_fresh_snapshot_and_reparses_stale_one(tmp_path, monkeypatch):
+    path = tmp_path / "portfolio.csv"
+    write_csv(path, [("Python", "https://example.com/py", "3 years", "Backend")])
+    snapshot = tmp_path / "portfolio.csv.snapshot"
+
+    assert [r.techstack for r in PortfolioStore.load(str(path))] == ["Python"]
+    assert snapshot.exists()
+
+    # A snapshot at least as new as the source is used without parsing the source
+    def fail(*args, **kwargs):
+        raise AssertionError("source should not be parsed")
+    with monkeypatch.context() as patch:
+        patch.setattr(PortfolioStore, "from_file", classmethod(fail))
+        assert [r.techstack for r in PortfolioStore.load(str(path))] == ["Python"]
+
+    # Editing the source makes the snapshot stale, so it is rebuilt
+    write_csv(path, [("Rust", "https://example.com/rs", "2 years", "Systems")])
+    snapshot_mtime = os.path.getmtime(snapshot)
+    os.utime(path, (snapshot_mtime + 10, snapshot_mtime + 10))
+    assert [r.techstack for r in PortfolioStore.load(str(path))] == ["Rust"]
+    assert [r.techstack for r in PortfolioStore.load_snapshot(str(snapshot))] == ["Rust"]
+
+
+def test_unreadable_snapshot_falls_back_to_source(tmp_path):
+    path = tmp_path / "portfolio.csv"
+    write_csv(path, [("Python", "https://example.com/py", "3 years", "Backend")])
+    snapshot = tmp_path / "portfolio.csv.snapshot"
+    snapshot.write_bytes(b"garbage")
+    os.utime(path, (0, 0))
+    assert [r.techstack for r in PortfolioStore.load(str(path))] == ["Python"]
+
+
+def test_truncated_snapshot_is_a_schema_error(tmp_path):
+    store = PortfolioStore.from_records(PortfolioRecord(f"Stack {i}", f"https://example.com/{i}") for i in range(20))
+    snapshot = tmp_path / "portfolio.snapshot"
+    store.save_snapshot(str(snapshot))
+    data = snapshot.read_bytes()
+
+    for cut in (0, 10, 30, 101, len(data) - 3):
+        snapshot.write_bytes(data[:cut])
+        with pytest.raises(PortfolioSchemaError):
+            PortfolioStore.load_snapshot(str(snapshot))
+
+    snapshot.write_bytes(data + b"\0\0\0\0")
+    with pytest.raises(PortfolioSchemaError):
+        PortfolioStore.load_snapshot(str(snapshot))
+
+
+@pytest.mark.parametrize("cut", [30, 101, -3])
+def test_load_reparses_source_when_snapshot_is_truncated(tmp_path, cut):
+    path = tmp_path / "portfolio.csv"
+    write_csv(path, [("Python", "https://example.com/py", "3 years", "Backend"),
+                     ("Rust", "https://example.com/rs", "2 years", "Systems")])
+    PortfolioStore.load(str(path))
+    snapshot = tmp_path / "portfolio.csv.snapshot"
+    snapshot.write_bytes(snapshot.read_bytes()[:cut])
+    os.utime(path, (0, 0))
+
+    assert [r.techstack for r in PortfolioStore.load(str(path))] == ["Python", "Rust"]
+    assert [r.techstack for r in PortfolioStore.load_snapshot(str(snapshot))] == ["Python", "Rust"]
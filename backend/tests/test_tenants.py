@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+from src.tenants import TenantPortfolios, UnknownTenantError
+
+
+@pytest.fixture
+def portfolios(tmp_path):
+    tenants_dir = tmp_path / "tenants"
+    tenants_dir.mkdir()
+    return TenantPortfolios(str(tenants_dir), str(tmp_path / "default.csv"), chroma_path=str(tmp_path / "chroma"))
+
+
+def test_unknown_tenant_is_not_counted_or_persisted(portfolios, tmp_path):
+    for i in range(100):
+        with pytest.raises(UnknownTenantError):
+            portfolios.get(f"nobody-{i}")
+    portfolios.flush_usage()
+
+    assert portfolios.stats()["usage"] == {}
+    assert portfolios._loading == {}
+    assert (tmp_path / "tenants" / ".usage.json").read_text() == "{}"
+
+
+def test_invalid_tenant_id_is_rejected(portfolios):
+    with pytest.raises(ValueError):
+        portfolios.get("../etc/passwd")
+
+
+def test_failed_load_releases_loading_lock(portfolios, tmp_path, monkeypatch):
+    (tmp_path / "tenants" / "acme.csv").write_text("Techstack,Links\nPython,https://example.com\n")
+
+    def broken_load(self):
+        raise RuntimeError("vector store unavailable")
+
+    monkeypatch.setattr("src.tenants.Portfolio.load_portfolio", broken_load)
+    with pytest.raises(RuntimeError):
+        portfolios.get("acme")
+
+    assert portfolios._loading == {}
+    assert portfolios.stats()["usage"] == {"acme": 1}